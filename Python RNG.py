@@ -1,15 +1,1384 @@
+import argparse
+import contextlib
 import random
 import os
 import time
 import json
-from datetime import datetime
+import math
+import heapq
+import mmap
+import shutil
+import signal
+import sqlite3
+import struct
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
 from pathlib import Path
+from types import MappingProxyType
 
-class PythonRNGGame:
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import curses
+except ImportError:
+    curses = None
+
+SHINY_BIT = 0x80
+BATCH_BLOCK_SIZE = 1 << 16
+OUTCOME_TABLE_CACHE_SIZE = 256
+PARALLEL_SHARD_SIZE = 1 << 18
+PARALLEL_THRESHOLD = 1 << 21
+SESSION_CACHE_SIZE = 1024
+SESSION_CACHE_BYTES = 256 << 20
+SESSION_BASE_BYTES = 64 << 10
+AUTOSAVE_INTERVAL = 30
+PROGRESS_INTERVAL = 0.1
+PROGRESS_LOG_INTERVAL = 5
+AGGREGATE_WINDOW = 1 << 24
+AGGREGATE_THRESHOLD = 1 << 27
+RNG_BUFFER_SIZE = 4096
+BIOME_CHANGE_ODDS = 10
+WEATHER_CHANGE_ODDS = 8
+ROLL_FILE_MAGIC = b"PRNGROLL"
+ROLL_FILE_HEADER = struct.Struct("<8sIIQ")
+ROLL_RECORD = struct.Struct("<QB")
+ROLL_FILE_MIN_CAPACITY = 1 << 16
+ROLL_FILE_CHUNK = 1 << 16
+JOURNAL_COMPACT_RECORDS = 64
+JOURNAL_COMPACT_BYTES = 4 << 20
+SQLITE_ROLL_CHUNK = 1 << 16
+SAVE_MAGIC = b"PRNGSAVE"
+SAVE_VERSION = 1
+SAVE_FILE_HEADER = struct.Struct("<8sHH")
+SAVE_SECTION = struct.Struct("<16sQQ")
+VISIT_RECORD = struct.Struct("<qB")
+EPOCH = datetime(1970, 1, 1)
+
+METRIC_BUCKETS = 26
+
+MASK64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+class RNGBackend:
+    kind = None
+
+    def random(self):
+        raise NotImplementedError
+
+    def randint(self, a, b):
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    def sample(self, population, k):
+        pool = list(population)
+        for i in range(k):
+            j = i + int(self.random() * (len(pool) - i))
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k]
+
+    def random_array(self, amount):
+        return np.array([self.random() for _ in range(amount)])
+
+    def integers_array(self, low, high, amount):
+        return low + (self.random_array(amount) * (high - low)).astype(np.int64)
+
+    def numpy_generator(self):
+        # binomial/multinomial sampling goes through NumPy, seeded from this
+        # stream so seeded runs stay reproducible
+        return np.random.default_rng(int(self.random() * (1 << 53)))
+
+class RandomBackend(RNGBackend):
+    kind = "random"
+
+    def __init__(self, seed=None):
+        self.generator = random.Random(seed)
+
+    def random(self):
+        return self.generator.random()
+
+    def randint(self, a, b):
+        return self.generator.randint(a, b)
+
+    def choice(self, seq):
+        return self.generator.choice(seq)
+
+    def sample(self, population, k):
+        return self.generator.sample(population, k)
+
+    def random_array(self, amount):
+        # 53-bit uniforms cut from the Mersenne Twister's byte stream instead
+        # of one random() call per value.
+        words = np.frombuffer(self.generator.randbytes(8 * amount), dtype=np.uint64)
+        return (words >> np.uint64(11)) * (1.0 / (1 << 53))
+
+class NumpyBackend(RNGBackend):
+    def __init__(self, seed=None, bit_generator="PCG64"):
+        if np is None:
+            raise RuntimeError(f"NumPy is required for the {bit_generator} RNG backend")
+        self.kind = bit_generator.lower()
+        self.generator = np.random.Generator(getattr(np.random, bit_generator)(seed))
+        self.buffer = []
+        self.index = 0
+
+    def random(self):
+        if self.index >= len(self.buffer):
+            self.buffer = self.generator.random(RNG_BUFFER_SIZE).tolist()
+            self.index = 0
+        value = self.buffer[self.index]
+        self.index += 1
+        return value
+
+    def random_array(self, amount):
+        return self.generator.random(amount)
+
+    def integers_array(self, low, high, amount):
+        return self.generator.integers(low, high, amount)
+
+    def numpy_generator(self):
+        return self.generator
+
+class CounterBackend(RNGBackend):
+    # SplitMix64 applied to (key, counter): draw n is a pure function of its
+    # position, so a run replays exactly from any saved counter.
+    kind = "counter"
+
+    def __init__(self, seed=None):
+        self.key = (seed if seed is not None else random.getrandbits(64)) & MASK64
+        self.counter = 0
+
+    def seek(self, counter):
+        self.counter = counter
+
+    def random(self):
+        self.counter += 1
+        z = (self.key + self.counter * GOLDEN_GAMMA) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return ((z ^ (z >> 31)) >> 11) * (1.0 / (1 << 53))
+
+    def random_array(self, amount):
+        z = np.arange(self.counter + 1, self.counter + amount + 1, dtype=np.uint64)
+        z = z * np.uint64(GOLDEN_GAMMA) + np.uint64(self.key)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        self.counter += amount
+        return ((z ^ (z >> np.uint64(31))) >> np.uint64(11)) * (1.0 / (1 << 53))
+
+RNG_BACKENDS = {
+    "random": RandomBackend,
+    "pcg64": lambda seed=None: NumpyBackend(seed, "PCG64"),
+    "philox": lambda seed=None: NumpyBackend(seed, "Philox"),
+    "counter": CounterBackend
+}
+
+def make_rng(kind="random", seed=None):
+    return RNG_BACKENDS[kind](seed)
+
+class AliasTable:
+    def __init__(self, outcomes):
+        # Vose's alias method: every slot holds its own outcome with
+        # probability prob[i] and hands the rest of its mass to alias[i].
+        self.codes = [code for code, _ in outcomes]
+        self.probabilities = [p for _, p in outcomes]
+        size = len(outcomes)
+        total = sum(self.probabilities)
+        scaled = [p * size / total for p in self.probabilities]
+        self.prob = [1.0] * size
+        self.alias = list(range(size))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        if np is not None:
+            self.codes_array = np.array(self.codes, dtype=np.uint8)
+            self.prob_array = np.array(self.prob)
+            self.alias_array = np.array(self.alias)
+
+    def draw_slot(self, u):
+        x = u * len(self.prob)
+        slot = int(x)
+        return slot if x - slot < self.prob[slot] else self.alias[slot]
+
+    def draw(self, u):
+        return self.codes[self.draw_slot(u)]
+
+    def sample(self, rng, amount):
+        x = rng.random_array(amount) * len(self.prob)
+        slots = x.astype(np.intp)
+        slots = np.where(x - slots < self.prob_array[slots], slots, self.alias_array[slots])
+        return self.codes_array[slots]
+
+def solve_linear(matrix, rhs):
+    if np is not None:
+        return np.linalg.solve(np.array(matrix), np.array(rhs)).tolist()
+    # Gaussian elimination with partial pivoting
+    size = len(rhs)
+    rows = [list(row) + [value] for row, value in zip(matrix, rhs)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        head = rows[col]
+        for r in range(col + 1, size):
+            factor = rows[r][col] / head[col]
+            if factor:
+                row = rows[r]
+                for c in range(col, size + 1):
+                    row[c] -= factor * head[c]
+    result = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        row = rows[r]
+        result[r] = (row[size] - sum(row[c] * result[c] for c in range(r + 1, size))) / row[r]
+    return result
+
+class Metrics:
+    # Opt-in timing histograms, counters and gauges. Bucket k counts
+    # observations under 1.024us * 2**k; callers check `enabled` first.
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = Counter()
+        self.gauges = {}
+
+    def observe(self, phase, nanoseconds):
+        histogram = self.histograms.get(phase)
+        if histogram is None:
+            # one slot per bucket, then count and sum
+            histogram = self.histograms[phase] = [0] * (METRIC_BUCKETS + 2)
+        histogram[min((nanoseconds >> 10).bit_length(), METRIC_BUCKETS - 1)] += 1
+        histogram[-2] += 1
+        histogram[-1] += nanoseconds
+
+    def bucket_bound(self, bucket):
+        return (1024 << bucket) / 1e9
+
+    def quantile(self, phase, q):
+        histogram = self.histograms[phase]
+        target = q * histogram[-2]
+        seen = 0
+        for bucket in range(METRIC_BUCKETS):
+            seen += histogram[bucket]
+            if seen >= target:
+                return self.bucket_bound(bucket)
+        return math.inf
+
+    def summary(self):
+        return [
+            (phase, histogram[-2], histogram[-1] / histogram[-2] / 1e9, self.quantile(phase, 0.5), self.quantile(phase, 0.99))
+            for phase, histogram in sorted(self.histograms.items()) if histogram[-2]
+        ]
+
+    def to_json(self):
+        histograms = {}
+        for phase, histogram in self.histograms.items():
+            cumulative = 0
+            buckets = {}
+            for bucket in range(METRIC_BUCKETS):
+                cumulative += histogram[bucket]
+                buckets[f"{self.bucket_bound(bucket):g}"] = cumulative
+            histograms[phase] = {"count": histogram[-2], "sum_seconds": histogram[-1] / 1e9, "buckets": buckets}
+        return {"histograms": histograms, "counters": dict(self.counters), "gauges": dict(self.gauges)}
+
+    def prometheus(self):
+        lines = ["# TYPE python_rng_phase_seconds histogram"]
+        for phase, histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bucket in range(METRIC_BUCKETS):
+                cumulative += histogram[bucket]
+                lines.append(f'python_rng_phase_seconds_bucket{{phase="{phase}",le="{self.bucket_bound(bucket):g}"}} {cumulative}')
+            lines.append(f'python_rng_phase_seconds_bucket{{phase="{phase}",le="+Inf"}} {histogram[-2]}')
+            lines.append(f'python_rng_phase_seconds_sum{{phase="{phase}"}} {histogram[-1] / 1e9}')
+            lines.append(f'python_rng_phase_seconds_count{{phase="{phase}"}} {histogram[-2]}')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE python_rng_{name}_total counter")
+            lines.append(f"python_rng_{name}_total {value}")
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE python_rng_{name} gauge")
+            lines.append(f"python_rng_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        path = Path(path)
+        text = json.dumps(self.to_json(), indent=4) if path.suffix == ".json" else self.prometheus()
+        temp_file = path.with_name(path.name + ".tmp")
+        with open(temp_file, "w", encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_file, path)
+
+class SaveJournal:
+    def __init__(self, save_file):
+        self.save_file = Path(save_file)
+        self.journal_file = self.save_file.with_suffix(".journal")
+        self.legacy_file = self.save_file.with_suffix(".json")
+        self.records = 0
+        self.seq = 0
+        self.snapshot_stale = False
+
+    def write_snapshot(self, state, sections=None):
+        self.seq += 1
+        state["save_seq"] = self.seq
+        sections = {"header": json.dumps(state, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), **(sections or {})}
+        offset = SAVE_FILE_HEADER.size + SAVE_SECTION.size * len(sections)
+        table = []
+        for name, data in sections.items():
+            table.append(SAVE_SECTION.pack(name.encode('ascii'), offset, len(data)))
+            offset += len(data)
+
+        temp_file = self.save_file.with_name(self.save_file.name + ".tmp")
+        with open(temp_file, "wb") as f:
+            f.write(SAVE_FILE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, len(sections)))
+            f.write(b"".join(table))
+            for data in sections.values():
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.save_file)
+        self.snapshot_stale = False
+        written = offset
+        # Records carry the save sequence number, so a crash between the
+        # rename and this truncate only leaves records that load skips.
+        with open(self.journal_file, "w", encoding='utf-8'):
+            pass
+        self.records = 0
+        return written
+
+    def append(self, record):
+        self.seq += 1
+        record["seq"] = self.seq
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with open(self.journal_file, "a", encoding='utf-8') as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.records += 1
+        return len(line.encode('utf-8')) + 1
+
+    def needs_compaction(self):
+        if self.snapshot_stale or not self.save_file.exists():
+            return True
+        if self.records >= JOURNAL_COMPACT_RECORDS:
+            return True
+        return self.journal_file.exists() and self.journal_file.stat().st_size >= JOURNAL_COMPACT_BYTES
+
+    def exists(self):
+        return self.save_file.exists() or self.legacy_file.exists()
+
+    def section_table(self, f):
+        magic, version, count = SAVE_FILE_HEADER.unpack(f.read(SAVE_FILE_HEADER.size))
+        if magic != SAVE_MAGIC or version > SAVE_VERSION:
+            raise ValueError(f"{self.save_file.name} is not a supported save file")
+        table = {}
+        for _ in range(count):
+            name, offset, length = SAVE_SECTION.unpack(f.read(SAVE_SECTION.size))
+            table[name.rstrip(b"\0").decode('ascii')] = (offset, length)
+        return table
+
+    def read_section(self, name):
+        with open(self.save_file, "rb") as f:
+            table = self.section_table(f)
+            if name not in table:
+                return b""
+            offset, length = table[name]
+            f.seek(offset)
+            return f.read(length)
+
+    def read(self):
+        if self.save_file.exists():
+            state = json.loads(self.read_section("header"))
+        else:
+            # JSON saves from before the binary format; the next snapshot
+            # converts them
+            with open(self.legacy_file, "r", encoding='utf-8') as f:
+                state = json.load(f)
+            self.snapshot_stale = True
+        self.seq = state.get("save_seq", 0)
+
+        records = []
+        if self.journal_file.exists():
+            good_bytes = 0
+            with open(self.journal_file, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    good_bytes += len(line)
+                    if record["seq"] > self.seq:
+                        records.append(record)
+                        self.seq = record["seq"]
+            # Drop a torn tail left by an interrupted append so later records
+            # don't get glued onto it.
+            if good_bytes < self.journal_file.stat().st_size:
+                with open(self.journal_file, "r+b") as f:
+                    f.truncate(good_bytes)
+        self.records = len(records)
+        return state, records
+
+class VisitLog:
+    def __init__(self, biome_names, entries=None):
+        self.biome_names = list(biome_names)
+        self.biome_index = {name: index for index, name in enumerate(self.biome_names)}
+        self.entries = list(entries or [])
+        self.loader = None
+        self.pending = 0
+
+    def defer(self, length, loader):
+        # Only the length is known until something reads the older entries;
+        # appends and tail slices work without loading them.
+        self.entries = []
+        self.loader = loader
+        self.pending = length
+
+    def load(self):
+        if self.loader is not None:
+            # a new list, so an encoder still holding the old one is unaffected
+            self.entries = list(self.loader())[:self.pending] + self.entries
+            self.loader = None
+            self.pending = 0
+
+    def encoder(self):
+        # Taken on the game thread; entries only grow, so the returned
+        # function can do the packing later on the save thread.
+        entries, count, loader, pending = self.entries, len(self.entries), self.loader, self.pending
+        def encode():
+            older = list(loader())[:pending] if loader is not None else []
+            return self.pack(older) + self.pack(entries[:count])
+        return encode
+
+    def encode(self):
+        return self.encoder()()
+
+    def pack(self, entries):
+        data = bytearray(VISIT_RECORD.size * len(entries))
+        for index, (timestamp, biome) in enumerate(entries):
+            micros = (datetime.fromisoformat(timestamp) - EPOCH) // timedelta(microseconds=1)
+            VISIT_RECORD.pack_into(data, index * VISIT_RECORD.size, micros, self.biome_index[biome])
+        return bytes(data)
+
+    def decode(self, data):
+        names = self.biome_names
+        return [
+            ((EPOCH + timedelta(microseconds=micros)).isoformat(), names[biome])
+            for micros, biome in VISIT_RECORD.iter_unpack(data)
+        ]
+
+    def __len__(self):
+        return self.pending + len(self.entries)
+
+    def __iter__(self):
+        self.load()
+        return iter(self.entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) and self.loader is not None:
+            start, stop, step = index.indices(len(self))
+            if step == 1 and start >= self.pending:
+                return self.entries[start - self.pending:stop - self.pending]
+        self.load()
+        return self.entries[index]
+
+    def append(self, entry):
+        self.entries.append(entry)
+
+    def extend(self, entries):
+        self.entries.extend(entries)
+
+class RollLog:
+    def __init__(self, aura_names):
+        self.aura_names = list(aura_names)
+        self.codes_by_name = {name: i for i, name in enumerate(self.aura_names)}
+        self.codes_by_name.update({f"Shiny {name}": i | SHINY_BIT for i, name in enumerate(self.aura_names)})
+        self.roll_numbers = array('Q')
+        self.aura_codes = array('B')
+        self.code_counts = [0] * 256
+        self.first_rolls = [0] * 256
+        self.last_rolls = [0] * 256
+
+    def name_of(self, code):
+        name = self.aura_names[code & ~SHINY_BIT]
+        return f"Shiny {name}" if code & SHINY_BIT else name
+
+    def __len__(self):
+        return len(self.aura_codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(self.roll_numbers[index], map(self.name_of, self.aura_codes[index])))
+        return (self.roll_numbers[index], self.name_of(self.aura_codes[index]))
+
+    def __iter__(self):
+        return zip(self.roll_numbers, map(self.name_of, self.aura_codes))
+
+    def append(self, entry):
+        roll_number, name = entry
+        self.append_code(roll_number, self.codes_by_name[name])
+
+    def append_code(self, roll_number, code):
+        self.roll_numbers.append(roll_number)
+        self.aura_codes.append(code)
+        self.index_code(roll_number, code)
+
+    def index_code(self, roll_number, code):
+        self.code_counts[code] += 1
+        if not self.first_rolls[code]:
+            self.first_rolls[code] = roll_number
+        self.last_rolls[code] = roll_number
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def extend_codes(self, first_roll, codes):
+        self.index_codes(first_roll, codes)
+        self.append_codes(first_roll, codes)
+
+    def extend_indexed(self, first_roll, codes, index):
+        # `index` is (code_counts, first_rolls, last_rolls) of a log that
+        # already holds `codes` from roll 1, e.g. a roll_shard worker's, so
+        # only the copy and a 256-entry merge happen here
+        self.append_codes(first_roll, codes)
+        offset = first_roll - 1
+        for code, (count, first, last) in enumerate(zip(*index)):
+            if count:
+                self.code_counts[code] += count
+                if not self.first_rolls[code]:
+                    self.first_rolls[code] = offset + first
+                self.last_rolls[code] = offset + last
+
+    def append_codes(self, first_roll, codes):
+        if np is not None and isinstance(codes, (np.ndarray, bytes)):
+            self.roll_numbers.frombytes(np.arange(first_roll, first_roll + len(codes), dtype=np.uint64).tobytes())
+            self.aura_codes.frombytes(codes if isinstance(codes, bytes) else codes.astype(np.uint8).tobytes())
+        elif isinstance(codes, bytes):
+            self.roll_numbers.extend(range(first_roll, first_roll + len(codes)))
+            self.aura_codes.frombytes(codes)
+        else:
+            self.roll_numbers.extend(range(first_roll, first_roll + len(codes)))
+            self.aura_codes.extend(codes)
+
+    def extend_records(self, roll_numbers, codes):
+        if np is not None and isinstance(codes, np.ndarray):
+            self.roll_numbers.frombytes(np.asarray(roll_numbers, dtype=np.uint64).tobytes())
+            self.aura_codes.frombytes(codes.astype(np.uint8).tobytes())
+        else:
+            self.roll_numbers.extend(roll_numbers)
+            self.aura_codes.extend(codes)
+
+    def index_records(self, roll_numbers, codes):
+        # roll_numbers must be ascending
+        self.index_positions(codes, lambda i: int(roll_numbers[i]))
+
+    def index_codes(self, first_roll, codes):
+        self.index_positions(codes, lambda i: first_roll + i)
+
+    def index_positions(self, codes, roll_number):
+        if np is not None:
+            codes = np.frombuffer(codes, dtype=np.uint8) if isinstance(codes, bytes) else np.asarray(codes, dtype=np.uint8)
+            counts = np.bincount(codes, minlength=256)
+            present, first_index = np.unique(codes, return_index=True)
+            _, last_index = np.unique(codes[::-1], return_index=True)
+            seen = zip(present.tolist(), first_index.tolist(), (len(codes) - 1 - last_index).tolist())
+        else:
+            counts = [0] * 256
+            first_seen = {}
+            last_seen = {}
+            for i, code in enumerate(codes):
+                counts[code] += 1
+                first_seen.setdefault(code, i)
+                last_seen[code] = i
+            seen = ((code, first_seen[code], last_seen[code]) for code in first_seen)
+
+        for code, first, last in seen:
+            self.code_counts[code] += int(counts[code])
+            if not self.first_rolls[code]:
+                self.first_rolls[code] = roll_number(first)
+            self.last_rolls[code] = roll_number(last)
+
+    def export_records(self):
+        return {
+            self.name_of(code): [self.code_counts[code], self.first_rolls[code], self.last_rolls[code]]
+            for code in range(256) if self.code_counts[code]
+        }
+
+    def import_records(self, records):
+        self.code_counts = [0] * 256
+        self.first_rolls = [0] * 256
+        self.last_rolls = [0] * 256
+        for name, (count, first, last) in records.items():
+            code = self.codes_by_name[name]
+            self.code_counts[code] = count
+            self.first_rolls[code] = first
+            self.last_rolls[code] = last
+
+    def clear(self):
+        del self.roll_numbers[:]
+        del self.aura_codes[:]
+        self.import_records({})
+
+class MappedRollLog(RollLog):
+    # Same read API as RollLog, but entries live in a fixed-width file of
+    # (roll_number u64, aura_code u8) records that is mmapped rather than
+    # read, so memory and open time don't grow with the history.
+    def __init__(self, aura_names, path):
+        super().__init__(aura_names)
+        self.path = Path(path)
+        exists = self.path.exists() and self.path.stat().st_size >= ROLL_FILE_HEADER.size
+        self.file = open(self.path, "r+b" if exists else "w+b")
+        if exists:
+            magic, version, record_size, self.stored_length = ROLL_FILE_HEADER.unpack(self.file.read(ROLL_FILE_HEADER.size))
+            if magic != ROLL_FILE_MAGIC or record_size != ROLL_RECORD.size:
+                self.file.close()
+                raise ValueError(f"{self.path} is not a roll history file")
+            self.capacity = (self.path.stat().st_size - ROLL_FILE_HEADER.size) // ROLL_RECORD.size
+        else:
+            self.stored_length = 0
+            self.capacity = 0
+            self.file.write(ROLL_FILE_HEADER.pack(ROLL_FILE_MAGIC, 1, ROLL_RECORD.size, 0))
+        self.length = self.stored_length
+        self.map = None
+        # held while the mapping is replaced, so an autosave syncing from
+        # another thread never flushes a closed map
+        self.lock = threading.Lock()
+        self.remap()
+
+    def remap(self):
+        if self.map is not None:
+            self.map.close()
+        self.map = mmap.mmap(self.file.fileno(), 0) if self.capacity else None
+
+    def reserve(self, needed):
+        if needed <= self.capacity:
+            return
+        self.capacity = max(needed, self.capacity * 2, ROLL_FILE_MIN_CAPACITY)
+        with self.lock:
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            self.file.truncate(ROLL_FILE_HEADER.size + self.capacity * ROLL_RECORD.size)
+            self.remap()
+
+    def offset(self, index):
+        return ROLL_FILE_HEADER.size + index * ROLL_RECORD.size
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("roll log index out of range")
+        roll_number, code = ROLL_RECORD.unpack_from(self.map, self.offset(index))
+        return (roll_number, self.name_of(code))
+
+    def __iter__(self):
+        for start in range(0, self.length, ROLL_FILE_CHUNK):
+            stop = min(start + ROLL_FILE_CHUNK, self.length)
+            chunk = self.map[self.offset(start):self.offset(stop)]
+            for roll_number, code in ROLL_RECORD.iter_unpack(chunk):
+                yield (roll_number, self.name_of(code))
+
+    def append_code(self, roll_number, code):
+        self.reserve(self.length + 1)
+        ROLL_RECORD.pack_into(self.map, self.offset(self.length), roll_number, code)
+        self.length += 1
+        self.index_code(roll_number, code)
+
+    def extend_records(self, roll_numbers, codes):
+        count = len(codes)
+        if not count:
+            return
+        self.reserve(self.length + count)
+        if np is not None:
+            records = np.empty(count, dtype=[("roll_number", "<u8"), ("code", "u1")])
+            records["roll_number"] = roll_numbers
+            records["code"] = np.frombuffer(codes, dtype=np.uint8) if isinstance(codes, bytes) else codes
+            data = records.tobytes()
+        else:
+            data = b"".join(ROLL_RECORD.pack(n, c) for n, c in zip(roll_numbers, codes))
+        self.map[self.offset(self.length):self.offset(self.length + count)] = data
+        self.length += count
+
+    def append_codes(self, first_roll, codes):
+        if np is not None:
+            roll_numbers = np.arange(first_roll, first_roll + len(codes), dtype=np.uint64)
+        else:
+            roll_numbers = range(first_roll, first_roll + len(codes))
+        self.extend_records(roll_numbers, codes)
+
+    def restore_length(self, length):
+        # Rolls past the last save may be in the file but were never committed.
+        self.length = min(length, self.stored_length)
+
+    def clear(self):
+        self.length = 0
+        self.import_records({})
+
+    def flush(self):
+        self.stored_length = self.length
+        self.sync(self.length)
+
+    def sync(self, length):
+        # Commits the first `length` records. Records past them may still be
+        # appended meanwhile; they only count once a later sync covers them.
+        with self.lock:
+            self.file.seek(0)
+            self.file.write(ROLL_FILE_HEADER.pack(ROLL_FILE_MAGIC, 1, ROLL_RECORD.size, length))
+            if self.map is not None:
+                self.map.flush()
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+class SQLiteRollLog(RollLog):
+    # Rolls already saved live in the database's rolls table; the base
+    # arrays only hold the ones appended since, until the next save
+    # inserts them.
+    def __init__(self, aura_names, connection, player, stored_length=0):
+        super().__init__(aura_names)
+        self.db = connection.db
+        self.lock = connection.lock
+        self.player = player
+        self.stored_length = stored_length
+
+    def __len__(self):
+        return self.stored_length + len(self.aura_codes)
+
+    def stored_rows(self, start, stop):
+        # the tail is read backwards so recent rolls don't pay for an OFFSET
+        # walk over the whole history
+        with self.lock:
+            if start >= self.stored_length - stop:
+                rows = self.db.execute(
+                    "SELECT roll_number, aura_id, shiny FROM rolls WHERE player = ? ORDER BY roll_number DESC LIMIT ? OFFSET ?",
+                    (self.player, stop - start, self.stored_length - stop)
+                ).fetchall()[::-1]
+            else:
+                rows = self.db.execute(
+                    "SELECT roll_number, aura_id, shiny FROM rolls WHERE player = ? ORDER BY roll_number LIMIT ? OFFSET ?",
+                    (self.player, stop - start, start)
+                ).fetchall()
+        return [(roll_number, self.name_of(aura_id | (SHINY_BIT if shiny else 0))) for roll_number, aura_id, shiny in rows]
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("roll log index out of range")
+            return self[index:index + 1][0]
+        start, stop, step = index.indices(len(self))
+        if stop <= start:
+            return []
+        entries = []
+        if start < self.stored_length:
+            entries = self.stored_rows(start, min(stop, self.stored_length))
+        if stop > self.stored_length:
+            entries += super().__getitem__(slice(max(start - self.stored_length, 0), stop - self.stored_length))
+        return entries[::step]
+
+    def __iter__(self):
+        # in pages, since other players' saves share the connection and a
+        # statement left open across them could be aborted by a rollback
+        last = 0
+        while True:
+            with self.lock:
+                rows = self.db.execute(
+                    "SELECT roll_number, aura_id, shiny FROM rolls WHERE player = ? AND roll_number > ? ORDER BY roll_number LIMIT ?",
+                    (self.player, last, SQLITE_ROLL_CHUNK)
+                ).fetchall()
+            for roll_number, aura_id, shiny in rows:
+                yield (roll_number, self.name_of(aura_id | (SHINY_BIT if shiny else 0)))
+            if len(rows) < SQLITE_ROLL_CHUNK:
+                break
+            last = rows[-1][0]
+        yield from super().__iter__()
+
+    def pending_rows(self, start, stop):
+        player = self.player
+        for roll_number, code in zip(self.roll_numbers[start:stop], self.aura_codes[start:stop]):
+            yield (player, roll_number, code & ~SHINY_BIT, 1 if code & SHINY_BIT else 0)
+
+    def mark_stored(self):
+        self.stored_length += len(self.aura_codes)
+        del self.roll_numbers[:]
+        del self.aura_codes[:]
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class SharedConnection:
+    # One connection per database file for every player saving to it. A
+    # transaction spans several statements, so each one runs under `lock`.
+    open_connections = {}
+    open_lock = threading.Lock()
+
+    @classmethod
+    def acquire(cls, db_file):
+        db_file = Path(db_file).resolve()
+        with cls.open_lock:
+            connection = cls.open_connections.get(db_file)
+            if connection is None:
+                connection = cls.open_connections[db_file] = cls(db_file)
+            connection.users += 1
+            return connection
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.users = 0
+        self.lock = threading.RLock()
+        # autocommit mode; saves manage their own transactions
+        self.db = sqlite3.connect(db_file, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SQLiteSaves.SCHEMA)
+        if "roll_high" not in [column[1] for column in self.db.execute("PRAGMA table_info(players)")]:
+            self.db.execute("ALTER TABLE players ADD COLUMN roll_high INTEGER")
+
+    def release(self):
+        with self.open_lock:
+            self.users -= 1
+            if self.users:
+                return
+            del self.open_connections[self.db_file]
+        with self.lock:
+            self.db.close()
+
+class SQLiteSaves:
+    # Any number of players in one database, saved incrementally. Rolls go in
+    # chunk by chunk before the state; roll_high marks the last roll a finished
+    # save covers, and rolls past it are dropped.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS players (
+            player TEXT PRIMARY KEY,
+            current_biome TEXT,
+            current_weather TEXT,
+            today_date INTEGER,
+            visited_biomes TEXT NOT NULL DEFAULT '[]',
+            roll_count INTEGER NOT NULL DEFAULT 0,
+            visit_count INTEGER NOT NULL DEFAULT 0,
+            roll_high INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS counters (
+            player TEXT NOT NULL,
+            name TEXT NOT NULL,
+            value INTEGER NOT NULL,
+            PRIMARY KEY (player, name)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS counters_by_value ON counters (name, value);
+        CREATE TABLE IF NOT EXISTS inventory (
+            player TEXT NOT NULL,
+            item TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            PRIMARY KEY (player, item)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS effects (
+            player TEXT NOT NULL,
+            item TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (player, item)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS quests (
+            player TEXT NOT NULL,
+            quest TEXT NOT NULL,
+            completed INTEGER NOT NULL,
+            PRIMARY KEY (player, quest)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS titles (
+            player TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            PRIMARY KEY (player, position)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS visits (
+            player TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            visited_at TEXT NOT NULL,
+            biome TEXT NOT NULL,
+            PRIMARY KEY (player, position)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS rolls (
+            player TEXT NOT NULL,
+            roll_number INTEGER NOT NULL,
+            aura_id INTEGER NOT NULL,
+            shiny INTEGER NOT NULL,
+            PRIMARY KEY (player, roll_number)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS rolls_by_aura ON rolls (aura_id, shiny, player, roll_number);
+    """
+
+    def __init__(self, db_file, player):
+        self.db_file = Path(db_file)
+        self.player = player
+        self.connection = SharedConnection.acquire(self.db_file)
+        self.db = self.connection.db
+        self.lock = self.connection.lock
+        self.saved_counters = {}
+        self.saved_inventory = Counter()
+        self.saved_quests = {}
+        self.saved_titles = 0
+        self.saved_visits = 0
+        self.saved_roll_high = 0
+
+    def exists(self):
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM players WHERE player = ?", (self.player,)).fetchone() is not None
+
+    def counters_of(self, game):
+        counters = {"total_rolls": game.total_rolls}
+        counters.update(game.aura_counts)
+        counters.update(game.shiny_aura_counts)
+        # the roll log's own per-outcome counts; they differ from the aura
+        # counts once rolls are spent on crafting or aggregated
+        for name, (count, _, _) in game.roll_log.export_records().items():
+            counters[f"logged:{name}"] = count
+        return counters
+
+    def write(self, game):
+        if not isinstance(game.roll_log, SQLiteRollLog):
+            roll_log = SQLiteRollLog(game.auras, self.connection, self.player)
+            roll_log.extend_records(game.roll_log.roll_numbers, game.roll_log.aura_codes)
+            roll_log.import_records(game.roll_log.export_records())
+            game.roll_log = roll_log
+
+        counters = self.counters_of(game)
+        inventory = Counter(game.item_inventory.counts)
+        player = self.player
+        roll_numbers = game.roll_log.roll_numbers
+        roll_high = roll_numbers[-1] if roll_numbers else self.saved_roll_high
+        try:
+            self.insert_rolls(game.roll_log)
+            with self.lock:
+                self.write_state(game, counters, inventory, roll_high)
+        except BaseException:
+            # the next save writes these rolls again
+            with self.lock, contextlib.suppress(sqlite3.Error):
+                self.discard_unsaved_rolls()
+            raise
+
+        game.roll_log.mark_stored()
+        self.saved_counters = counters
+        self.saved_inventory = inventory
+        self.saved_quests = dict(game.quest_status)
+        self.saved_titles = len(game.titles_earned)
+        self.saved_visits = len(game.visit_log)
+        self.saved_roll_high = roll_high
+
+    def insert_rolls(self, roll_log):
+        for start in range(0, len(roll_log.aura_codes), SQLITE_ROLL_CHUNK):
+            with self.lock:
+                self.db.execute("BEGIN IMMEDIATE")
+                try:
+                    self.db.executemany(
+                        "INSERT OR REPLACE INTO rolls (player, roll_number, aura_id, shiny) VALUES (?, ?, ?, ?)",
+                        roll_log.pending_rows(start, start + SQLITE_ROLL_CHUNK)
+                    )
+                    self.db.execute("COMMIT")
+                except BaseException:
+                    self.db.execute("ROLLBACK")
+                    raise
+
+    def discard_unsaved_rolls(self):
+        self.db.execute("DELETE FROM rolls WHERE player = ? AND roll_number > ?", (self.player, self.saved_roll_high))
+
+    def write_state(self, game, counters, inventory, roll_high):
+        player = self.player
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            self.db.execute(
+                "INSERT INTO players (player, current_biome, current_weather, today_date, visited_biomes, roll_count, visit_count, roll_high) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (player) DO UPDATE SET "
+                "current_biome = excluded.current_biome, current_weather = excluded.current_weather, "
+                "today_date = excluded.today_date, visited_biomes = excluded.visited_biomes, "
+                "roll_count = excluded.roll_count, visit_count = excluded.visit_count, roll_high = excluded.roll_high",
+                (player, game.current_biome, game.current_weather, game.today_date,
+                 json.dumps(sorted(game.visited_biomes)), len(game.roll_log), len(game.visit_log), roll_high)
+            )
+            self.db.executemany(
+                "INSERT INTO counters (player, name, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (player, name) DO UPDATE SET value = excluded.value",
+                [(player, name, value) for name, value in counters.items() if self.saved_counters.get(name) != value]
+            )
+            changed_items = [item for item in inventory.keys() | self.saved_inventory.keys() if inventory[item] != self.saved_inventory[item]]
+            self.db.executemany("DELETE FROM inventory WHERE player = ? AND item = ?", [(player, item) for item in changed_items if not inventory[item]])
+            self.db.executemany(
+                "INSERT INTO inventory (player, item, quantity) VALUES (?, ?, ?) "
+                "ON CONFLICT (player, item) DO UPDATE SET quantity = excluded.quantity",
+                [(player, item, inventory[item]) for item in changed_items if inventory[item]]
+            )
+            self.db.execute("DELETE FROM effects WHERE player = ?", (player,))
+            self.db.executemany("INSERT INTO effects (player, item, expires_at) VALUES (?, ?, ?)", [(player, item, expiry) for item, expiry in game.item_effects.items()])
+            self.db.executemany(
+                "INSERT INTO quests (player, quest, completed) VALUES (?, ?, ?) "
+                "ON CONFLICT (player, quest) DO UPDATE SET completed = excluded.completed",
+                [(player, quest, int(done)) for quest, done in game.quest_status.items() if self.saved_quests.get(quest) != done]
+            )
+            self.db.executemany("DELETE FROM quests WHERE player = ? AND quest = ?", [(player, quest) for quest in self.saved_quests.keys() - game.quest_status.keys()])
+            if len(game.titles_earned) < self.saved_titles:
+                self.db.execute("DELETE FROM titles WHERE player = ?", (player,))
+                self.saved_titles = 0
+            self.db.executemany(
+                "INSERT INTO titles (player, position, title) VALUES (?, ?, ?)",
+                [(player, position, title) for position, title in enumerate(game.titles_earned) if position >= self.saved_titles]
+            )
+            self.db.executemany(
+                "INSERT INTO visits (player, position, visited_at, biome) VALUES (?, ?, ?, ?)",
+                [(player, position, timestamp, biome) for position, (timestamp, biome) in enumerate(game.visit_log[self.saved_visits:], self.saved_visits)]
+            )
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def read(self, game):
+        player = self.player
+        with self.lock:
+            row = self.db.execute(
+                "SELECT current_biome, current_weather, today_date, visited_biomes, roll_count, visit_count, roll_high FROM players WHERE player = ?",
+                (player,)
+            ).fetchone()
+            current_biome, current_weather, today_date, visited_biomes, roll_count, visit_count, roll_high = row
+            if roll_high is None:
+                # saved before roll_high existed, when rolls were written in the
+                # same transaction as everything else
+                roll_high = self.db.execute("SELECT MAX(roll_number) FROM rolls WHERE player = ?", (player,)).fetchone()[0] or 0
+            self.saved_roll_high = roll_high
+            self.discard_unsaved_rolls()
+            counters = dict(self.db.execute("SELECT name, value FROM counters WHERE player = ?", (player,)))
+            inventory = Counter(dict(self.db.execute("SELECT item, quantity FROM inventory WHERE player = ?", (player,))))
+            quests = {quest: bool(done) for quest, done in self.db.execute("SELECT quest, completed FROM quests WHERE player = ?", (player,))}
+            titles = [title for title, in self.db.execute("SELECT title FROM titles WHERE player = ? ORDER BY position", (player,))]
+
+            game.apply_header({
+                "aura_counts": {name: counters.get(name, 0) for name in game.aura_counts},
+                "shiny_aura_counts": {name: counters.get(name, 0) for name in game.shiny_aura_counts},
+                "total_rolls": counters.get("total_rolls", 0),
+                "visited_biomes": json.loads(visited_biomes),
+                "item_counts": dict(inventory),
+                "item_effects": dict(self.db.execute("SELECT item, expires_at FROM effects WHERE player = ?", (player,))),
+                "quest_status": quests,
+                "titles_earned": titles,
+                "current_biome": current_biome,
+                "current_weather": current_weather,
+                "today_date": today_date
+            })
+            game.roll_log = SQLiteRollLog(game.auras, self.connection, player, roll_count)
+            game.roll_log.import_records(self.personal_records(game, counters))
+            game.visit_log = VisitLog(game.biomes)
+            game.visit_log.defer(visit_count, self.stored_visits)
+
+            self.saved_counters = counters
+            self.saved_inventory = inventory
+            self.saved_quests = dict(quests)
+            self.saved_titles = len(titles)
+            self.saved_visits = visit_count
+
+    def stored_visits(self):
+        with self.lock:
+            return self.db.execute("SELECT visited_at, biome FROM visits WHERE player = ? ORDER BY position", (self.player,)).fetchall()
+
+    def personal_records(self, game, counters):
+        # first/latest roll per outcome are index seeks on rolls_by_aura
+        records = {}
+        for name, count in counters.items():
+            if not name.startswith("logged:") or not count:
+                continue
+            name = name[len("logged:"):]
+            code = game.roll_log.codes_by_name[name]
+            first, last = self.db.execute(
+                "SELECT MIN(roll_number), MAX(roll_number) FROM rolls WHERE aura_id = ? AND shiny = ? AND player = ?",
+                (code & ~SHINY_BIT, 1 if code & SHINY_BIT else 0, self.player)
+            ).fetchone()
+            records[name] = [count, first or 0, last or 0]
+        return records
+
+    def top_players(self, limit=10):
+        with self.lock:
+            return self.db.execute(
+                "SELECT player, value FROM counters WHERE name = 'total_rolls' ORDER BY value DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def rarest_pulls(self, limit=10):
+        # rolls_by_aura is ordered by aura id, which follows rarity
+        with self.lock:
+            return self.db.execute(
+                "SELECT aura_id, shiny, player, MIN(roll_number) FROM rolls "
+                "GROUP BY aura_id, shiny, player ORDER BY aura_id DESC, shiny DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.release()
+            self.connection = None
+
+class GoalIndex:
+    def __init__(self, goals, order=None):
+        self.goals = goals
+        self.order = order if order is not None else {name: i for i, name in enumerate(goals)}
+        self.pending = {}
+
+    def arm(self, names):
+        # Pending goals are kept per metric, highest threshold first, so a
+        # check only looks at the lowest threshold still waiting on each one.
+        self.pending = {}
+        for name in names:
+            metric, threshold = self.goals[name][1]
+            self.pending.setdefault(metric, []).append((threshold, name))
+        for queue in self.pending.values():
+            queue.sort(reverse=True)
+
+    def crossed(self, state):
+        reached = []
+        for metric, queue in self.pending.items():
+            if queue:
+                value = getattr(state, metric)
+                while queue and queue[-1][0] <= value:
+                    reached.append(queue.pop()[1])
+        reached.sort(key=self.order.get)
+        return reached
+
+class Inventory:
+    # Item multiset with O(1) add, remove and count; iterating yields every copy.
+    def __init__(self, items=()):
+        self.counts = Counter()
+        self.total = 0
+        self.load(items)
+
+    def load(self, items):
+        # a {item: count} mapping, or the flat list older saves hold
+        self.counts.clear()
+        self.total = 0
+        pairs = items.items() if isinstance(items, dict) else Counter(items).items()
+        for item, count in pairs:
+            self.add(item, count)
+
+    def add(self, item, count=1):
+        if count > 0:
+            self.counts[item] += count
+            self.total += count
+
+    def remove(self, item, count=1):
+        have = self.counts.get(item, 0)
+        if have < count:
+            raise ValueError(f"Not enough {item} (need {count}, have {have})")
+        if have == count:
+            del self.counts[item]
+        else:
+            self.counts[item] = have - count
+        self.total -= count
+
+    def count(self, item):
+        return self.counts.get(item, 0)
+
+    def items(self):
+        return self.counts.items()
+
+    def to_dict(self):
+        return dict(self.counts)
+
+    def __contains__(self, item):
+        return item in self.counts
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        return self.counts.elements()
+
+class EventSink:
+    def emit(self, kind, **data):
+        raise NotImplementedError
+
+class NullSink(EventSink):
+    def emit(self, kind, **data):
+        pass
+
+class CountingSink(EventSink):
+    def __init__(self):
+        self.counts = Counter()
+
+    def emit(self, kind, **data):
+        if kind == "roll_batch":
+            self.counts["roll"] += data["count"]
+        else:
+            self.counts[kind] += 1
+
+class SummarySink(CountingSink):
+    def __init__(self):
+        super().__init__()
+        self.notable_rolls = []
+        self.buffered = []
+
+    def emit(self, kind, **data):
+        super().emit(kind, **data)
+        if kind == "roll_batch":
+            self.notable_rolls.extend(data["notable"])
+        elif kind == "roll":
+            if data["shiny"] or data["rarity"] >= 1000:
+                self.notable_rolls.append((data["roll_number"], data["name"], data["rarity"], data["shiny"]))
+        elif kind not in ("biome_changed", "weather_changed"):
+            self.buffered.append((kind, data))
+
+    def replay(self, sink):
+        for kind, data in self.buffered:
+            sink.emit(kind, **data)
+        self.buffered.clear()
+
+class ConsoleSink(EventSink):
+    def __init__(self):
+        # lines printed so far, so the menu knows whether they scrolled it
+        self.lines = 0
+
+    def print(self, text):
+        print(text)
+        self.lines += 1
+
+    def emit(self, kind, **data):
+        if kind == "roll":
+            self.render_roll(data["name"], data["rarity"], data["shiny"])
+        elif kind == "quest_completed":
+            self.print(f"🎯 Quest Completed: {data['quest']}! Reward: {data['reward']}")
+        elif kind == "achievement_unlocked":
+            self.print(f"🏆 Achievement Unlocked: {data['title']} - {data['description']}")
+        elif kind == "effect_expired":
+            self.print(f"⏰ Effect of {data['item']} has expired.")
+        elif kind == "biome_changed":
+            self.print(f"🗺️  Discovered new biome: {data['biome']}!")
+        elif kind == "weather_changed":
+            self.print(f"🌤️  Weather changed to: {data['weather']}")
+        elif kind == "autosave_failed":
+            self.print(f"❌ Autosave failed: {data['error']}")
+
+    def render_roll(self, name, original_rarity, shiny):
+        if shiny:
+            self.print(f"✨🌟 SHINY AURA! You rolled: {name} (1 in {original_rarity:,}) 🌟✨")
+            if original_rarity >= 1000000:
+                self.print("🎆 BEYOND LEGENDARY SHINY! THE UNIVERSE TREMBLES! 🎆")
+            elif original_rarity >= 100000:
+                self.print("🌌 MYTHICAL SHINY! REALITY BENDS! 🌌")
+            elif original_rarity >= 10000:
+                self.print("💫 LEGENDARY SHINY! INCREDIBLE! 💫")
+            elif original_rarity >= 1000:
+                self.print("🔥 ULTRA RARE SHINY! AMAZING! 🔥")
+        else:
+            self.print(f"🎲 You rolled: {name} (1 in {original_rarity:,})")
+            
+            if original_rarity >= 5000000:
+                self.print("🎆 OMNIPOTENT PULL! THE COSMOS ACKNOWLEDGES YOU! 🎆")
+            elif original_rarity >= 1000000:
+                self.print("🌟 DIVINE PULL! THE GODS SMILE UPON YOU! 🌟")
+            elif original_rarity >= 100000:
+                self.print("🌌 MYTHICAL PULL! LEGENDS WILL BE TOLD! 🌌")
+            elif original_rarity >= 10000:
+                self.print("💫 LEGENDARY PULL! EXTRAORDINARY! 💫")
+            elif original_rarity >= 1000:
+                self.print("⚡ ULTRA RARE PULL! INCREDIBLE! ⚡")
+            elif original_rarity >= 100:
+                self.print("🔥 RARE PULL! GREAT JOB! 🔥")
+
+class ProgressReporter:
+    # Progress callback for batch rolls, redrawn at most every PROGRESS_INTERVAL.
+    # Inside listen(), Ctrl-C only sets `stopped` and the loop ends on a block
+    # boundary.
+    def __init__(self, summary, stream=None, clock=time.perf_counter):
+        self.summary = summary
+        self.stream = stream if stream is not None else sys.stdout
+        self.clock = clock
+        self.start = self.last_report = clock()
+        self.stopped = False
+        self.width = 0
+        try:
+            self.interactive = self.stream.isatty()
+        except (AttributeError, ValueError):
+            self.interactive = False
+        self.interval = PROGRESS_INTERVAL if self.interactive else PROGRESS_LOG_INTERVAL
+
+    @contextlib.contextmanager
+    def listen(self):
+        # handlers can only be installed from the main thread
+        if threading.current_thread() is not threading.main_thread():
+            yield self
+            return
+        previous = signal.signal(signal.SIGINT, self.interrupt)
+        try:
+            yield self
+        finally:
+            signal.signal(signal.SIGINT, previous)
+
+    def interrupt(self, signum, frame):
+        self.stopped = True
+
+    def __call__(self, done, total):
+        now = self.clock()
+        if done < total and not self.stopped and now - self.last_report >= self.interval:
+            self.last_report = now
+            self.show(self.status(done, total, now - self.start))
+        return self.stopped
+
+    def format_eta(self, seconds):
+        seconds = int(seconds)
+        if seconds >= 3600:
+            return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+        if seconds >= 60:
+            return f"{seconds // 60}m {seconds % 60:02d}s"
+        return f"{seconds}s"
+
+    def status(self, done, total, elapsed):
+        rate = done / elapsed if elapsed > 0 else 0
+        eta = self.format_eta((total - done) / rate) if rate else "?"
+        notable = self.summary.notable_rolls
+        line = f"🎲 {done:,}/{total:,} ({done / total:.1%}) | {rate:,.0f} rolls/s | ETA {eta} | 🎉 {len(notable)} notable"
+        if notable:
+            line += f", latest {notable[-1][1]}"
+        return line
+
+    def show(self, line):
+        if not self.interactive:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+            return
+        # a wrapped line could not be overwritten with \r, so stay on one row
+        # (the two emoji are two columns wide each)
+        line = line[:shutil.get_terminal_size().columns - 3]
+        self.stream.write("\r" + line.ljust(self.width))
+        self.stream.flush()
+        self.width = len(line)
+
+    def finish(self):
+        if self.width:
+            self.stream.write("\r" + " " * self.width + "\r")
+            self.stream.flush()
+            self.width = 0
+
+class GameContent:
+    # Static game data and the tables derived from it, built once and shared
+    # read-only by every game in the process.
     def __init__(self):
-        self.script_dir = Path(__file__).parent
-        self.save_file = self.script_dir / "AaranyaRNGSaves.json"
-        
         self.auras = {
             "Amber": (2, ["Plains", "Forest"]),
             "Jade": (4, ["Forest", "Crystal Caves"]),
@@ -33,15 +1402,24 @@ class PythonRNGGame:
             "Omnipotent": (10000000, ["Crystal Caves"])
         }
 
-        self.aura_counts = {name: 0 for name in self.auras}
-        self.shiny_aura_counts = {f"Shiny {name}": 0 for name in self.auras}
-        self.total_rolls = 0
-        self.roll_log = []
-        self.visit_log = []
-        
-        self.item_inventory = []
-        self.item_effects = {}
-        
+        self.biomes = {
+            "Plains": 1.0,
+            "Forest": 0.9,
+            "Desert": 1.1,
+            "Mountain": 0.8,
+            "Volcano": 1.2,
+            "Crystal Caves": 0.7,
+            "Void Realm": 0.5,
+            "Cosmic Nexus": 0.6,
+            "Ethereal Plane": 0.4,
+            "Divine Sanctum": 0.3
+        }
+
+        self.weather_types = [
+            "Clear", "Rain", "Snow", "Wind", "Storm", "Mist", 
+            "Aurora", "Eclipse", "Starfall", "Void Storm"
+        ]
+
         self.global_shop_pool = {
             "Common": [
                 ("Shiny Sticker", None),
@@ -80,270 +1458,533 @@ class PythonRNGGame:
                 ("Divine Relic", "Divine")
             ]
         }
-        
-        self.daily_shop = {}
-        self.shop_last_refresh = None
-        self.today_date = None
-        
+
+        self.item_usage_effects = {
+            "Lucky Charm": ("luck", 60),
+            "Mystic Scroll": ("luck", 120),
+            "Cosmic Key": ("luck", 180),
+            "Forest Potion": ("biome_luck", 300),
+            "Desert Talisman": ("rare_boost", 240),
+            "Galaxy Orb": ("shiny_boost", 180),
+            "Galactic Crown": ("mega_luck", 600),
+            "Volcano Heart": ("ultra_rare_boost", 480)
+        }
+
+        self.crafted_recipes = {
+            "Fortune Device": {
+                "requires": {"Lucky Charm": 2, "Amber": 5},
+                "effect": ("luck", 300)
+            },
+            "Memetic Device": {
+                "requires": {"Shiny Sticker": 1, "Ruby": 3},
+                "effect": ("luck", 600)
+            },
+            "Probability Manipulator": {
+                "requires": {"Cosmic Key": 1, "Diamond": 2, "Mystic Scroll": 3},
+                "effect": ("mega_luck", 900)
+            },
+            "Reality Bender": {
+                "requires": {"Galactic Crown": 1, "Singularity": 1, "Volcano Heart": 2},
+                "effect": ("ultimate_luck", 1800)
+            },
+            "Dimensional Anchor": {
+                "requires": {"Void Crystal": 1, "Cosmic Medallion": 1, "Ethereal Essence": 2},
+                "effect": ("godmode", 3600)
+            }
+        }
+
         self.all_quests = {
             "Roll Novice": (
                 "Roll 10 times",
-                lambda: self.total_rolls >= 10,
+                ("total_rolls", 10),
                 "Lucky Charm"
             ),
             "Roll Apprentice": (
                 "Roll 50 times",
-                lambda: self.total_rolls >= 50,
+                ("total_rolls", 50),
                 "Mystic Scroll"
             ),
             "Roll Expert": (
                 "Roll 100 times",
-                lambda: self.total_rolls >= 100,
+                ("total_rolls", 100),
                 "Cosmic Key"
             ),
             "Aura Collector": (
                 "Collect 5 different auras",
-                lambda: len([a for a in self.aura_counts if self.aura_counts[a] > 0]) >= 5,
+                ("unique_auras", 5),
                 "Forest Potion"
             ),
             "Aura Master": (
                 "Collect 10 different auras",
-                lambda: len([a for a in self.aura_counts if self.aura_counts[a] > 0]) >= 10,
+                ("unique_auras", 10),
                 "Galaxy Orb"
             ),
             "Biome Explorer": (
                 "Visit all 6 biomes",
-                lambda: self.visited_biomes == set(self.biomes.keys()),
+                ("biomes_visited", len(self.biomes)),
                 "Desert Talisman"
             ),
             "Shiny Hunter": (
                 "Obtain any shiny aura",
-                lambda: any(self.shiny_aura_counts[a] > 0 for a in self.shiny_aura_counts),
+                ("unique_shinies", 1),
                 "Galactic Crown"
             ),
             "Rare Collector": (
                 "Collect an aura with rarity 1000+",
-                lambda: any(self.aura_counts[name] > 0 for name, (rarity, _) in self.auras.items() if rarity >= 1000),
+                ("max_rarity", 1000),
                 "Volcano Heart"
             )
         }
-        
-        self.quest_status = {}
-        self.visited_biomes = set()
-        
-        self.item_usage_effects = {
-            "Lucky Charm": ("luck", 60),
-            "Mystic Scroll": ("luck", 120),
-            "Cosmic Key": ("luck", 180),
-            "Forest Potion": ("biome_luck", 300),
-            "Desert Talisman": ("rare_boost", 240),
-            "Galaxy Orb": ("shiny_boost", 180),
-            "Galactic Crown": ("mega_luck", 600),
-            "Volcano Heart": ("ultra_rare_boost", 480)
-        }
-        
-        self.crafted_recipes = {
-            "Fortune Device": {
-                "requires": {"Lucky Charm": 2, "Amber": 5},
-                "effect": ("luck", 300)
-            },
-            "Memetic Device": {
-                "requires": {"Shiny Sticker": 1, "Ruby": 3},
-                "effect": ("luck", 600)
-            },
-            "Probability Manipulator": {
-                "requires": {"Cosmic Key": 1, "Diamond": 2, "Mystic Scroll": 3},
-                "effect": ("mega_luck", 900)
-            },
-            "Reality Bender": {
-                "requires": {"Galactic Crown": 1, "Singularity": 1, "Volcano Heart": 2},
-                "effect": ("ultimate_luck", 1800)
-            },
-            "Dimensional Anchor": {
-                "requires": {"Void Crystal": 1, "Cosmic Medallion": 1, "Ethereal Essence": 2},
-                "effect": ("godmode", 3600)
-            }
-        }
-        
+
         self.achievement_milestones = {
             "Aura Guru": (
                 "Collect 10 unique auras",
-                lambda: len([a for a in self.aura_counts if self.aura_counts[a] > 0]) >= 10
+                ("unique_auras", 10)
             ),
             "Aura Legend": (
                 "Collect 15 unique auras",
-                lambda: len([a for a in self.aura_counts if self.aura_counts[a] > 0]) >= 15
+                ("unique_auras", 15)
             ),
             "Shiny Hunter": (
                 "Obtain 1 Shiny Aura",
-                lambda: any(self.shiny_aura_counts[a] > 0 for a in self.shiny_aura_counts)
+                ("unique_shinies", 1)
             ),
             "Shiny Master": (
                 "Obtain 5 different Shiny Auras",
-                lambda: len([a for a in self.shiny_aura_counts if self.shiny_aura_counts[a] > 0]) >= 5
+                ("unique_shinies", 5)
             ),
             "Roll Master": (
                 "Complete 100 rolls",
-                lambda: self.total_rolls >= 100
+                ("total_rolls", 100)
             ),
             "Roll Legend": (
                 "Complete 1000 rolls",
-                lambda: self.total_rolls >= 1000
+                ("total_rolls", 1000)
             ),
             "Roll God": (
                 "Complete 10000 rolls",
-                lambda: self.total_rolls >= 10000
+                ("total_rolls", 10000)
             ),
             "Biome Wanderer": (
                 "Visit all biomes",
-                lambda: len(self.visited_biomes) >= len(self.biomes)
+                ("biomes_visited", len(self.biomes))
             ),
             "Rare Finder": (
                 "Find an aura with 1000+ rarity",
-                lambda: any(self.aura_counts[name] > 0 for name, (rarity, _) in self.auras.items() if rarity >= 1000)
+                ("max_rarity", 1000)
             ),
             "Legendary Seeker": (
                 "Find an aura with 100000+ rarity",
-                lambda: any(self.aura_counts[name] > 0 for name, (rarity, _) in self.auras.items() if rarity >= 100000)
+                ("max_rarity", 100000)
             ),
             "Mythical Being": (
                 "Find an aura with 5000000+ rarity",
-                lambda: any(self.aura_counts[name] > 0 for name, (rarity, _) in self.auras.items() if rarity >= 5000000)
+                ("max_rarity", 5000000)
             )
         }
+
+        self.freeze()
+
+    def freeze(self):
+        self.auras = MappingProxyType({name: (rarity, tuple(locations)) for name, (rarity, locations) in self.auras.items()})
+        self.biomes = MappingProxyType(self.biomes)
+        self.weather_types = tuple(self.weather_types)
+        self.global_shop_pool = MappingProxyType({tier: tuple(items) for tier, items in self.global_shop_pool.items()})
+        self.item_usage_effects = MappingProxyType(self.item_usage_effects)
+        self.crafted_recipes = MappingProxyType({
+            name: MappingProxyType({"requires": MappingProxyType(recipe["requires"]), "effect": recipe["effect"]})
+            for name, recipe in self.crafted_recipes.items()
+        })
+        self.all_quests = MappingProxyType(self.all_quests)
+        self.achievement_milestones = MappingProxyType(self.achievement_milestones)
+
+        self.aura_names = tuple(self.auras)
+        self.shiny_names = tuple(f"Shiny {name}" for name in self.aura_names)
+        self.aura_index = MappingProxyType({name: i for i, name in enumerate(self.aura_names)})
+        self.aura_rarities = tuple(rarity for rarity, _ in self.auras.values())
+        self.sorted_auras = tuple(sorted(self.auras.items(), key=lambda x: x[1][0]))
+        # rarest first, for finding the highest rarity still held
+        self.rarity_order = tuple((rarity, name) for name, (rarity, _) in reversed(self.sorted_auras))
+        self.biome_names = tuple(self.biomes)
+        self.biome_index = MappingProxyType({name: i for i, name in enumerate(self.biome_names)})
+        self.weather_index = MappingProxyType({name: i for i, name in enumerate(self.weather_types)})
+        # auras in declaration order per biome, as calculate_roll_outcome scans them
+        self.auras_by_biome = MappingProxyType({
+            biome: tuple((name, rarity) for name, (rarity, locations) in self.auras.items() if biome in locations)
+            for biome in self.biome_names
+        })
+        # every aura code, shiny or not, that a roll report calls out
+        notable = [False] * 256
+        for code, rarity in enumerate(self.aura_rarities):
+            notable[code] = rarity >= 1000
+            notable[code | SHINY_BIT] = True
+        self.notable_codes = tuple(notable)
+        # which recipe materials are auras (spent from aura_counts) and which are items
+        self.recipe_materials = MappingProxyType({
+            name: tuple((mat, qty, mat in self.auras) for mat, qty in recipe["requires"].items())
+            for name, recipe in self.crafted_recipes.items()
+        })
+        self.quest_order = MappingProxyType({name: i for i, name in enumerate(self.all_quests)})
+        self.achievement_order = MappingProxyType({name: i for i, name in enumerate(self.achievement_milestones)})
+
+CONTENT = GameContent()
+
+class PythonRNGGame:
+    def __init__(self, events=None, rng=None, save_file=None, database=None, metrics=None, content=None):
+        self.events = events if events is not None else ConsoleSink()
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.rng = rng if rng is not None else RandomBackend()
+        # wall-clock seconds for days and effect expiries; simulations swap
+        # in their own
+        self.clock = time.time
+        self.script_dir = Path(__file__).parent
+        self.save_file = Path(save_file) if save_file is not None else self.script_dir / "AaranyaRNGSaves.sav"
+        self.save_journal = SaveJournal(self.save_file)
+        self.database = database
+        self.autosave = None
+        self.renderer = None
+        self.saved_visit_count = 0
         
-        self.titles_earned = []
+        self.content = content if content is not None else CONTENT
+        # read-only views of the shared content, under the names the rest of
+        # the game already uses
+        content = self.content
+        self.auras = content.auras
+        self.biomes = content.biomes
+        self.weather_types = content.weather_types
+        self.global_shop_pool = content.global_shop_pool
+        self.item_usage_effects = content.item_usage_effects
+        self.crafted_recipes = content.crafted_recipes
+        self.all_quests = content.all_quests
+        self.achievement_milestones = content.achievement_milestones
+        self.sorted_auras = content.sorted_auras
+        self.aura_names = content.aura_names
+        self.aura_index = content.aura_index
+        self.aura_rarities = content.aura_rarities
+
+        self.aura_counts = dict.fromkeys(self.auras, 0)
+        self.shiny_aura_counts = dict.fromkeys(content.shiny_names, 0)
+        self.total_rolls = 0
+        self.roll_log = RollLog(self.aura_names)
         
-        self.biomes = {
-            "Plains": 1.0,
-            "Forest": 0.9,
-            "Desert": 1.1,
-            "Mountain": 0.8,
-            "Volcano": 1.2,
-            "Crystal Caves": 0.7,
-            "Void Realm": 0.5,
-            "Cosmic Nexus": 0.6,
-            "Ethereal Plane": 0.4,
-            "Divine Sanctum": 0.3
-        }
+        self.item_inventory = Inventory()
+        self.item_effects = {}
+        self.effect_expiries = []
+        self.next_effect_expiry = math.inf
+        self.active_effect_types = frozenset()
+        self.luck_multiplier = 1.0
+        self.shiny_chance = 250
         
-        self.weather_types = [
-            "Clear", "Rain", "Snow", "Wind", "Storm", "Mist", 
-            "Aurora", "Eclipse", "Starfall", "Void Storm"
-        ]
+        self.daily_shop = {}
+        self.shop_last_refresh = None
+        self.today_date = None
+        self.visit_log = VisitLog(content.biome_names)
+        
+        self.quest_status = {}
+        self.visited_biomes = set()
+        
+        self.titles_earned = []
+
+        self.unique_auras = 0
+        self.unique_shinies = 0
+        self.max_rarity = 0
+        self.quest_goals = GoalIndex(self.all_quests, content.quest_order)
+        self.achievement_goals = GoalIndex(self.achievement_milestones, content.achievement_order)
+        self.achievement_goals.arm(self.achievement_milestones)
         
         self.current_biome = "Plains"
         self.current_weather = "Clear"
         self.weather_last_change = None
-        
-        self.sorted_auras = sorted(self.auras.items(), key=lambda x: x[1][0])
+        self.outcome_tables = OrderedDict()
+        self.outcome_table_builds = 0
 
-    def clear_screen(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
-
-    def save_state(self):
-        state = {
-            "aura_counts": self.aura_counts,
-            "shiny_aura_counts": self.shiny_aura_counts,
+    def snapshot_header(self):
+        # copies, so the autosave thread can serialize them while play goes on
+        return {
+            "aura_counts": dict(self.aura_counts),
+            "shiny_aura_counts": dict(self.shiny_aura_counts),
             "total_rolls": self.total_rolls,
-            "roll_log": self.roll_log,
             "visited_biomes": list(self.visited_biomes),
-            "item_inventory": self.item_inventory,
-            "item_effects": self.item_effects,
-            "quest_status": self.quest_status,
-            "titles_earned": self.titles_earned,
+            "item_counts": self.item_inventory.to_dict(),
+            "item_effects": dict(self.item_effects),
+            "quest_status": dict(self.quest_status),
+            "titles_earned": list(self.titles_earned),
             "current_biome": self.current_biome,
             "current_weather": self.current_weather,
             "today_date": self.today_date,
-            "visit_log": self.visit_log
+            "roll_records": self.roll_log.export_records()
         }
+
+    def apply_header(self, state):
+        self.aura_counts.update(state.get("aura_counts", {}))
+        self.shiny_aura_counts.update(state.get("shiny_aura_counts", {}))
+        self.total_rolls = state.get("total_rolls", 0)
+        self.visited_biomes = set(state.get("visited_biomes", []))
+        self.item_inventory.load(state.get("item_counts", state.get("item_inventory", [])))
+        self.item_effects.update(state.get("item_effects", {}))
+        self.quest_status.update(state.get("quest_status", {}))
+        self.titles_earned[:] = state.get("titles_earned", [])
+        self.current_biome = state.get("current_biome", self.current_biome)
+        self.current_weather = state.get("current_weather", self.current_weather)
+        self.today_date = state.get("today_date", self.today_date)
+
+    def roll_file(self):
+        return self.save_file.with_suffix(".rolls")
+
+    def attach_roll_file(self):
+        if isinstance(self.roll_log, MappedRollLog):
+            return
+        mapped = MappedRollLog(self.auras, self.roll_file())
+        mapped.clear()
+        mapped.extend_records(self.roll_log.roll_numbers, self.roll_log.aura_codes)
+        mapped.import_records(self.roll_log.export_records())
+        self.roll_log = mapped
+
+    def save_exists(self):
+        if self.database is not None:
+            return self.database.exists()
+        return self.save_journal.exists()
+
+    def save_sizes(self):
+        if self.database is not None:
+            paths = {"database": self.database.db_file, "database_wal": Path(f"{self.database.db_file}-wal")}
+        else:
+            paths = {"snapshot": self.save_file, "journal": self.save_journal.journal_file, "roll_file": self.roll_file()}
+        return {name: path.stat().st_size for name, path in paths.items() if path.exists()}
+
+    def record_save_metrics(self, phase, start):
+        self.metrics.observe(phase, time.perf_counter_ns() - start)
+        for name, size in self.save_sizes().items():
+            self.metrics.gauges[f"{name}_bytes"] = size
+
+    def write_save(self):
+        self.prepare_save()()
+
+    def prepare_save(self):
+        # Reads the game state now and returns a job that only does the disk
+        # writes, so the autosave thread can run it while play continues.
+        if self.database is not None:
+            start = time.perf_counter_ns()
+            self.database.write(self)
+            commit = lambda: 0
+        else:
+            commit = self.prepare_save_files()
+            start = time.perf_counter_ns()
+
+        def job():
+            written = commit()
+            self.metrics.counters["save_bytes_written"] += written
+            if self.metrics.enabled:
+                self.record_save_metrics("save", start)
+        return job
+
+    def prepare_save_files(self):
+        self.attach_roll_file()
+        roll_log = self.roll_log
+        roll_length = roll_log.stored_length = len(roll_log)
+        if self.save_journal.needs_compaction():
+            state = self.snapshot_header()
+            state["roll_log_length"] = roll_length
+            state["visit_log_length"] = len(self.visit_log)
+            encode_visits = self.visit_log.encoder()
+            write = lambda: self.save_journal.write_snapshot(state, {"visit_log": encode_visits()})
+        else:
+            record = {
+                "state": self.snapshot_header(),
+                "roll_log_length": roll_length,
+                "visit_start": self.saved_visit_count,
+                "visits": self.visit_log[self.saved_visit_count:]
+            }
+            write = lambda: self.save_journal.append(record)
+        visit_count = len(self.visit_log)
+
+        def commit():
+            # The roll file is synced first so the length recorded in the
+            # save never points past what is on disk.
+            roll_log.sync(roll_length)
+            written = write()
+            # only once it is on disk, so a failed save's visits go out
+            # with the next record
+            self.saved_visit_count = visit_count
+            return written
+        return commit
+
+    def save_state(self):
         try:
-            with open(self.save_file, "w", encoding='utf-8') as f:
-                json.dump(state, f, indent=4, ensure_ascii=False, sort_keys=True)
+            if self.autosave is not None:
+                self.autosave.flush(force=True)
+            else:
+                self.write_save()
             print("✅ Game saved successfully!")
         except Exception as e:
             print(f"❌ Error saving game: {e}")
 
+    def read_save(self):
+        start = time.perf_counter_ns()
+        if self.database is not None:
+            self.database.read(self)
+        else:
+            self.read_save_files()
+        self.recompute_aggregates()
+        self.recompute_effects()
+        if self.metrics.enabled:
+            self.record_save_metrics("load", start)
+
+    def read_save_files(self):
+        state, records = self.save_journal.read()
+
+        if isinstance(self.roll_log, MappedRollLog):
+            self.roll_log.close()
+        self.roll_log = MappedRollLog(self.auras, self.roll_file())
+
+        self.apply_header(state)
+        if "roll_log" in state:
+            # saves from before the roll file keep the history inline
+            self.roll_log.clear()
+            self.roll_log.extend(state["roll_log"])
+            self.save_journal.snapshot_stale = True
+        else:
+            self.roll_log.restore_length(state.get("roll_log_length", 0))
+        visit_log = self.visit_log = VisitLog(self.biomes, state.get("visit_log"))
+        if "visit_log_length" in state:
+            visit_log.defer(state["visit_log_length"], lambda: visit_log.decode(self.save_journal.read_section("visit_log")))
+
+        for record in records:
+            self.apply_header(record["state"])
+            if "rolls" in record:
+                skip = len(self.roll_log) - record["roll_start"]
+                self.roll_log.extend(record["rolls"][max(skip, 0):])
+            else:
+                self.roll_log.restore_length(record["roll_log_length"])
+            skip = len(self.visit_log) - record["visit_start"]
+            # JSON hands the entries back as lists
+            self.visit_log.extend(map(tuple, record["visits"][max(skip, 0):]))
+
+        latest = records[-1]["state"] if records else state
+        if "roll_records" in latest:
+            self.roll_log.import_records(latest["roll_records"])
+        self.saved_visit_count = len(self.visit_log)
+
     def load_state(self):
-        if not self.save_file.exists():
+        if not self.save_exists():
             print("📁 No save file found - starting fresh!")
             return
 
         try:
-            with open(self.save_file, "r", encoding='utf-8') as f:
-                state = json.load(f)
-            
-            self.aura_counts.update(state.get("aura_counts", {}))
-            self.shiny_aura_counts.update(state.get("shiny_aura_counts", {}))
-            self.total_rolls = state.get("total_rolls", 0)
-            self.roll_log[:] = state.get("roll_log", [])
-            self.visited_biomes = set(state.get("visited_biomes", []))
-            self.item_inventory[:] = state.get("item_inventory", [])
-            self.item_effects.update(state.get("item_effects", {}))
-            self.quest_status.update(state.get("quest_status", {}))
-            self.titles_earned[:] = state.get("titles_earned", [])
-            self.current_biome = state.get("current_biome", self.current_biome)
-            self.current_weather = state.get("current_weather", self.current_weather)
-            self.today_date = state.get("today_date", self.today_date)
-            self.visit_log[:] = state.get("visit_log", [])
-            
+            converting = self.database is None and not self.save_file.exists()
+            if self.autosave is not None:
+                # loading throws away unsaved progress, as it always has
+                self.autosave.wait()
+                self.autosave.dirty = False
+            self.read_save()
+            if converting:
+                self.write_save()
+                print(f"🔄 Converted {self.save_journal.legacy_file.name} to {self.save_file.name}")
             print("✅ Game loaded successfully!")
         except Exception as e:
             print(f"❌ Error loading game: {e}")
 
     def refresh_daily(self):
-        day = datetime.now().timetuple().tm_yday
+        day = datetime.fromtimestamp(self.clock()).timetuple().tm_yday
         if self.today_date != day:
             self.daily_shop.clear()
             for tier, items in self.global_shop_pool.items():
-                available_items = min(len(items), random.randint(1, 3))
-                self.daily_shop[tier] = random.sample(items, available_items)
+                available_items = min(len(items), self.rng.randint(1, 3))
+                self.daily_shop[tier] = self.rng.sample(items, available_items)
             self.shop_last_refresh = day
 
             self.quest_status.clear()
             for quest in self.all_quests:
                 self.quest_status[quest] = False
+            self.quest_goals.arm(self.all_quests)
 
             self.visited_biomes.clear()
             self.visited_biomes.add(self.current_biome)
             self.today_date = day
 
     def update_weather(self):
-        now = time.time()
+        now = self.clock()
         if self.weather_last_change is None or (now - self.weather_last_change) > 300:
-            self.current_weather = random.choice(self.weather_types)
+            self.current_weather = self.rng.choice(self.weather_types)
             self.weather_last_change = now
 
+    @property
+    def biomes_visited(self):
+        return len(self.visited_biomes)
+
+    def change_aura_count(self, name, delta):
+        shiny = name.startswith("Shiny ")
+        counts = self.shiny_aura_counts if shiny else self.aura_counts
+        before = counts[name]
+        counts[name] = before + delta
+        if (before > 0) == (before + delta > 0):
+            return
+
+        step = 1 if before + delta > 0 else -1
+        if shiny:
+            self.unique_shinies += step
+            return
+        self.unique_auras += step
+        rarity = self.auras[name][0]
+        if step > 0:
+            self.max_rarity = max(self.max_rarity, rarity)
+        elif rarity == self.max_rarity:
+            self.max_rarity = self.highest_held_rarity()
+
+    def highest_held_rarity(self):
+        for rarity, name in self.content.rarity_order:
+            if self.aura_counts[name] > 0:
+                return rarity
+        return 0
+
+    def recompute_aggregates(self):
+        self.unique_auras = sum(1 for count in self.aura_counts.values() if count > 0)
+        self.unique_shinies = sum(1 for count in self.shiny_aura_counts.values() if count > 0)
+        self.max_rarity = self.highest_held_rarity()
+        self.quest_goals.arm(q for q in self.all_quests if not self.quest_status.get(q))
+        self.achievement_goals.arm(t for t in self.achievement_milestones if t not in self.titles_earned)
+
     def check_quests(self):
-        for quest, (desc, requirement, reward) in self.all_quests.items():
-            if not self.quest_status.get(quest) and requirement():
+        for quest in self.quest_goals.crossed(self):
+            if not self.quest_status.get(quest):
+                reward = self.all_quests[quest][2]
                 self.quest_status[quest] = True
-                self.item_inventory.append(reward)
-                print(f"🎯 Quest Completed: {quest}! Reward: {reward}")
+                self.item_inventory.add(reward)
+                self.events.emit("quest_completed", quest=quest, reward=reward)
 
     def check_achievements(self):
-        for title, (desc, requirement) in self.achievement_milestones.items():
-            if title not in self.titles_earned and requirement():
+        for title in self.achievement_goals.crossed(self):
+            if title not in self.titles_earned:
+                desc = self.achievement_milestones[title][0]
                 self.titles_earned.append(title)
-                print(f"🏆 Achievement Unlocked: {title} - {desc}")
+                self.events.emit("achievement_unlocked", title=title, description=desc)
 
-    def apply_item_effects(self):
-        now = time.time()
-        expired = [item for item, expiry in self.item_effects.items() if expiry <= now]
-        for item in expired:
-            del self.item_effects[item]
-            print(f"⏰ Effect of {item} has expired.")
+    def effect_for(self, item):
+        if item in self.item_usage_effects:
+            return self.item_usage_effects[item]
+        if item in self.crafted_recipes:
+            return self.crafted_recipes[item]["effect"]
+        return None
 
-    def get_luck_multiplier(self):
-        multiplier = 1.0
-        active_effects = []
-        
+    def start_effect(self, item, duration):
+        expiry = self.clock() + duration
+        self.item_effects[item] = expiry
+        self.recompute_effects()
+
+    def recompute_effects(self):
+        now = self.clock()
+        self.effect_expiries = [(expiry, item) for item, expiry in self.item_effects.items()]
+        heapq.heapify(self.effect_expiries)
+        self.next_effect_expiry = self.effect_expiries[0][0] if self.effect_expiries else math.inf
+
+        active_effects = set()
         for item, expiry in self.item_effects.items():
-            if expiry > time.time():
-                if item in self.item_usage_effects:
-                    effect_type, _ = self.item_usage_effects[item]
-                    active_effects.append(effect_type)
-        
+            effect = self.effect_for(item)
+            if expiry > now and effect:
+                active_effects.add(effect[0])
+        self.active_effect_types = frozenset(active_effects)
+
+        multiplier = 1.0
         if "godmode" in active_effects:
             multiplier *= 100
         elif "ultimate_luck" in active_effects:
@@ -359,8 +2000,132 @@ class PythonRNGGame:
             multiplier *= 3
         if "biome_luck" in active_effects:
             multiplier *= 2
-            
-        return multiplier
+        self.luck_multiplier = multiplier
+
+        if "shiny_boost" in active_effects:
+            self.shiny_chance = 100
+        elif "godmode" in active_effects:
+            self.shiny_chance = 10
+        else:
+            self.shiny_chance = 250
+        self.outcome_tables.clear()
+
+    def apply_item_effects(self):
+        now = self.clock()
+        if now < self.next_effect_expiry:
+            return
+
+        # recompute_effects rebuilds the heap from item_effects, so every
+        # entry is current
+        while self.effect_expiries and self.effect_expiries[0][0] <= now:
+            _, item = heapq.heappop(self.effect_expiries)
+            del self.item_effects[item]
+            self.events.emit("effect_expired", item=item)
+        self.recompute_effects()
+
+    def get_luck_multiplier(self):
+        self.apply_item_effects()
+        return self.luck_multiplier
+
+    def material_count(self, mat, is_aura):
+        return self.aura_counts[mat] if is_aura else self.item_inventory.count(mat)
+
+    def recipe_shortfall(self, recipe_name, times=1):
+        missing = []
+        for mat, qty, is_aura in self.content.recipe_materials[recipe_name]:
+            have = self.material_count(mat, is_aura)
+            if have < qty * times:
+                missing.append(f"{mat} (need {qty * times}, have {have})")
+        return missing
+
+    def max_crafts(self, recipe_name):
+        return min(self.material_count(mat, is_aura) // qty for mat, qty, is_aura in self.content.recipe_materials[recipe_name])
+
+    def craft(self, recipe_name, times=1):
+        # times=None crafts as many as the materials allow; either every
+        # craft happens or, when something is missing, none does
+        if recipe_name not in self.crafted_recipes:
+            raise ValueError(f"Unknown recipe: {recipe_name}")
+        if times is None:
+            times = self.max_crafts(recipe_name)
+            if not times:
+                raise ValueError(f"Missing materials: {', '.join(self.recipe_shortfall(recipe_name))}")
+        elif times < 1:
+            raise ValueError("times must be at least 1")
+        missing = self.recipe_shortfall(recipe_name, times)
+        if missing:
+            raise ValueError(f"Missing materials: {', '.join(missing)}")
+
+        for mat, qty, is_aura in self.content.recipe_materials[recipe_name]:
+            if is_aura:
+                self.change_aura_count(mat, -qty * times)
+            else:
+                self.item_inventory.remove(mat, qty * times)
+        self.item_inventory.add(recipe_name, times)
+        self.mark_dirty()
+        return times
+
+    def use_item(self, item, copies=1):
+        # Copies used together stack their durations into one effect.
+        if copies < 1:
+            raise ValueError("copies must be at least 1")
+        have = self.item_inventory.count(item)
+        if have < copies:
+            raise ValueError(f"{item} is not in your inventory" if not have else f"You only have {have} {item}")
+        self.item_inventory.remove(item, copies)
+        effect = self.effect_for(item)
+        if effect:
+            effect = (effect[0], effect[1] * copies)
+            self.start_effect(item, effect[1])
+        self.mark_dirty()
+        return effect
+
+    def prompt(self, text):
+        if self.autosave is None:
+            return input(text)
+        with self.autosave.idle():
+            return input(text)
+
+    def mark_dirty(self):
+        if self.autosave is not None:
+            self.autosave.touch()
+
+    def buy_items(self, items):
+        # All or nothing: every item must be in today's shop and the auras
+        # they cost must cover the whole order before anything is spent.
+        self.refresh_daily()
+        prices = {name: required_aura for stock in self.daily_shop.values() for name, required_aura in stock}
+        cost = Counter()
+        for item in items:
+            if item not in prices:
+                raise ValueError(f"{item} is not in today's shop")
+            if prices[item]:
+                cost[prices[item]] += 1
+        for aura, needed in cost.items():
+            have = self.aura_counts.get(aura, 0)
+            if have < needed:
+                raise ValueError(f"You need {aura} aura to buy this item." if needed == 1 else f"You need {needed} {aura} auras, you have {have}.")
+
+        for aura, needed in cost.items():
+            self.change_aura_count(aura, -needed)
+        for item in items:
+            self.item_inventory.add(item)
+        self.mark_dirty()
+
+    def stats(self):
+        return {
+            "total_rolls": self.total_rolls,
+            "unique_auras": self.unique_auras,
+            "unique_shinies": self.unique_shinies,
+            "total_auras": sum(self.aura_counts.values()),
+            "total_shinies": sum(self.shiny_aura_counts.values()),
+            "biomes_visited": len(self.visited_biomes),
+            "current_biome": self.current_biome,
+            "current_weather": self.current_weather,
+            "titles_earned": list(self.titles_earned),
+            "item_inventory": self.item_inventory.to_dict(),
+            "active_effects": sorted(self.active_effect_types)
+        }
 
     def craft_item(self):
         print("\n🔨 === Crafting Menu ===")
@@ -379,7 +2144,7 @@ class PythonRNGGame:
         print("0. Cancel")
 
         try:
-            choice = int(input("Select recipe number: "))
+            choice = int(self.prompt("Select recipe number: "))
             if choice == 0:
                 return
             if choice < 1 or choice > len(recipes):
@@ -388,62 +2153,47 @@ class PythonRNGGame:
                 
             recipe_name, data = recipes[choice - 1]
 
-            can_craft = True
-            missing_items = []
-            
-            for mat, qty in data["requires"].items():
-                if mat in self.auras:
-                    if self.aura_counts.get(mat, 0) < qty:
-                        can_craft = False
-                        missing_items.append(f"{mat} (need {qty}, have {self.aura_counts.get(mat, 0)})")
-                else:
-                    available = self.item_inventory.count(mat)
-                    if available < qty:
-                        can_craft = False
-                        missing_items.append(f"{mat} (need {qty}, have {available})")
-
-            if not can_craft:
+            missing_items = self.recipe_shortfall(recipe_name)
+            if missing_items:
                 print("❌ Cannot craft - missing materials:")
                 for item in missing_items:
                     print(f"   - {item}")
                 return
 
-            for mat, qty in data["requires"].items():
-                if mat in self.auras:
-                    self.aura_counts[mat] -= qty
-                else:
-                    for _ in range(qty):
-                        self.item_inventory.remove(mat)
+            most = self.max_crafts(recipe_name)
+            times = 1
+            if most > 1:
+                answer = self.prompt(f"How many? (1-{most}, 'max' for {most}, Enter for 1): ").strip().lower()
+                times = most if answer == "max" else int(answer or 1)
+            if times < 1 or times > most:
+                print("Invalid amount.")
+                return
 
-            self.item_inventory.append(recipe_name)
-            print(f"✅ Successfully crafted {recipe_name}!")
+            self.craft(recipe_name, times)
+            print(f"✅ Successfully crafted {recipe_name}{f' x{times}' if times > 1 else ''}!")
             
         except (ValueError, IndexError):
             print("Invalid choice.")
         
-        input("\nPress Enter to continue...")
+        self.prompt("\nPress Enter to continue...")
 
     def view_inventory(self):
         print("\n🎒 === Your Item Inventory ===")
         if not self.item_inventory:
             print("Your inventory is empty.")
-            input("\nPress Enter to continue...")
+            self.prompt("\nPress Enter to continue...")
             return
 
-        item_counts = {}
-        for item in self.item_inventory:
-            item_counts[item] = item_counts.get(item, 0) + 1
-
-        items = list(item_counts.keys())
+        items = list(self.item_inventory.counts)
         for idx, item in enumerate(items, 1):
-            count = item_counts[item]
+            count = self.item_inventory.count(item)
             count_str = f" x{count}" if count > 1 else ""
             print(f"{idx}. {item}{count_str}")
 
         print("0. Back to menu")
         
         try:
-            choice = int(input("\nSelect item number to use: "))
+            choice = int(self.prompt("\nSelect item number to use: "))
             if choice == 0:
                 return
             if choice < 1 or choice > len(items):
@@ -451,22 +2201,25 @@ class PythonRNGGame:
                 return
                 
             selected = items[choice - 1]
-            if selected in self.item_inventory:
-                self.item_inventory.remove(selected)
-                
-                if selected in self.item_usage_effects:
-                    effect_type, duration = self.item_usage_effects[selected]
-                    self.item_effects[selected] = time.time() + duration
-                    print(f"✨ Used {selected}! {effect_type.replace('_', ' ').title()} boost for {duration} seconds!")
-                else:
-                    print(f"🔮 Used {selected}. Something mystical happens...")
+            have = self.item_inventory.count(selected)
+            copies = 1
+            if have > 1:
+                copies = int(self.prompt(f"How many to use? (1-{have}, Enter for 1): ").strip() or 1)
+            if copies < 1 or copies > have:
+                print("Invalid amount.")
             else:
-                print("Item not found in inventory.")
+                effect = self.use_item(selected, copies)
+                used = f"{selected} x{copies}" if copies > 1 else selected
+                if effect:
+                    effect_type, duration = effect
+                    print(f"✨ Used {used}! {effect_type.replace('_', ' ').title()} boost for {duration} seconds!")
+                else:
+                    print(f"🔮 Used {used}. Something mystical happens...")
                 
         except (ValueError, IndexError):
             print("Invalid choice.")
             
-        input("\nPress Enter to continue...")
+        self.prompt("\nPress Enter to continue...")
 
     def open_daily_shop(self):
         self.refresh_daily()
@@ -476,7 +2229,7 @@ class PythonRNGGame:
         
         if not self.daily_shop:
             print("The shop is closed today. Come back tomorrow!")
-            input("\nPress Enter to continue...")
+            self.prompt("\nPress Enter to continue...")
             return
             
         all_items = []
@@ -495,27 +2248,26 @@ class PythonRNGGame:
         print("\n0. Exit shop")
         
         try:
-            choice = int(input("\nEnter item number to buy: "))
-            if choice == 0:
+            answer = self.prompt("\nEnter item number(s) to buy, e.g. 1 or 1,3,3: ")
+            choices = [int(part) for part in answer.replace(",", " ").split()]
+            if not choices or choices == [0]:
                 return
-            if choice < 1 or choice > len(all_items):
+            if any(choice < 1 or choice > len(all_items) for choice in choices):
                 print("Invalid choice.")
                 return
-                
-            item, required_aura, can_afford = all_items[choice - 1]
-            
-            if not can_afford:
-                print(f"❌ You need {required_aura} aura to buy this item.")
+
+            order = [all_items[choice - 1][0] for choice in choices]
+            try:
+                self.buy_items(order)
+            except ValueError as e:
+                print(f"❌ {e}")
             else:
-                if required_aura:
-                    self.aura_counts[required_aura] -= 1
-                self.item_inventory.append(item)
-                print(f"✅ Purchased: {item}")
+                print(f"✅ Purchased: {', '.join(order)}")
                 
         except (ValueError, IndexError):
             print("Invalid choice.")
             
-        input("\nPress Enter to continue...")
+        self.prompt("\nPress Enter to continue...")
 
     def view_quests(self):
         self.refresh_daily()
@@ -527,7 +2279,7 @@ class PythonRNGGame:
             print(f"   Reward: {reward} [{status}]")
             print()
             
-        input("Press Enter to continue...")
+        self.prompt("Press Enter to continue...")
 
     def view_roll_stats(self):
         print("\n📊 === Roll Statistics ===")
@@ -538,177 +2290,623 @@ class PythonRNGGame:
         
         print("\n✨ Aura Collection:")
         total_auras = sum(self.aura_counts.values())
-        unique_auras = len([a for a in self.aura_counts if self.aura_counts[a] > 0])
         print(f"   Total Auras: {total_auras:,}")
-        print(f"   Unique Auras: {unique_auras}/{len(self.auras)}")
+        print(f"   Unique Auras: {self.unique_auras}/{len(self.auras)}")
         
         print("\n🌟 Shiny Collection:")
         total_shinies = sum(self.shiny_aura_counts.values())
-        unique_shinies = len([a for a in self.shiny_aura_counts if self.shiny_aura_counts[a] > 0])
         print(f"   Total Shinies: {total_shinies}")
-        print(f"   Unique Shinies: {unique_shinies}/{len(self.auras)}")
+        print(f"   Unique Shinies: {self.unique_shinies}/{len(self.auras)}")
         
         if self.titles_earned:
             print("\n🏅 Your Titles:")
             for title in self.titles_earned:
                 print(f"   • {title}")
+
+        if self.metrics.enabled:
+            print("\n⏱️ Hot Path Timings:")
+            print(f"   {'phase':<26} {'count':>10} {'mean µs':>10} {'p50 µs':>10} {'p99 µs':>10}")
+            for phase, count, mean, p50, p99 in self.metrics.summary():
+                print(f"   {phase:<26} {count:>10,} {mean * 1e6:>10.1f} {p50 * 1e6:>10.1f} {p99 * 1e6:>10.1f}")
+            for name, value in sorted(self.metrics.counters.items()):
+                print(f"   {name}: {value:,}")
+            for name, value in sorted(self.metrics.gauges.items()):
+                print(f"   {name}: {value:,}")
                 
-        input("\nPress Enter to continue...")
+        self.prompt("\nPress Enter to continue...")
 
-    def update_biome_and_weather(self):
-        if random.randint(1, 10) == 1:
-            new_biome = random.choice(list(self.biomes.keys()))
+    def update_biome_and_weather(self, announce=True):
+        if self.rng.randint(1, BIOME_CHANGE_ODDS) == 1:
+            new_biome = self.rng.choice(self.content.biome_names)
             if new_biome != self.current_biome:
                 self.current_biome = new_biome
                 self.visited_biomes.add(new_biome)
                 self.visit_log.append((datetime.now().isoformat(), new_biome))
-                print(f"🗺️  Discovered new biome: {new_biome}!")
+                if announce:
+                    self.events.emit("biome_changed", biome=new_biome)
 
-        if random.randint(1, 8) == 1:
+        if self.rng.randint(1, WEATHER_CHANGE_ODDS) == 1:
             old_weather = self.current_weather
-            self.current_weather = random.choice(self.weather_types)
-            if old_weather != self.current_weather:
-                print(f"🌤️  Weather changed to: {self.current_weather}")
+            self.current_weather = self.rng.choice(self.weather_types)
+            if announce and old_weather != self.current_weather:
+                self.events.emit("weather_changed", weather=self.current_weather)
 
-    def calculate_roll_outcome(self):
-        base_modifier = self.biomes.get(self.current_biome, 1.0)
-        luck_multiplier = self.get_luck_multiplier()
-        
-        weather_modifier = 1.0
-        if self.current_weather in ["Storm", "Eclipse", "Starfall", "Void Storm"]:
-            weather_modifier = 0.8
-        elif self.current_weather in ["Aurora", "Mist"]:
-            weather_modifier = 0.9
+    def get_weather_modifier(self, weather):
+        if weather in ["Storm", "Eclipse", "Starfall", "Void Storm"]:
+            return 0.8
+        elif weather in ["Aurora", "Mist"]:
+            return 0.9
+        return 1.0
+
+    def get_shiny_chance(self):
+        self.apply_item_effects()
+        return self.shiny_chance
+
+    def calculate_roll_outcome(self, biome=None, weather=None, luck_multiplier=None):
+        biome = self.current_biome if biome is None else biome
+        weather = self.current_weather if weather is None else weather
+        base_modifier = self.biomes.get(biome, 1.0)
+        if luck_multiplier is None:
+            luck_multiplier = self.get_luck_multiplier()
+        weather_modifier = self.get_weather_modifier(weather)
         
         roll_pool = []
-        for name, (rarity, locations) in self.auras.items():
-            if self.current_biome in locations:
-                adjusted_rarity = max(1, int(rarity * base_modifier * weather_modifier / luck_multiplier))
-                roll_pool.append((name, adjusted_rarity))
+        for name, rarity in self.content.auras_by_biome.get(biome, ()):
+            adjusted_rarity = max(1, int(rarity * base_modifier * weather_modifier / luck_multiplier))
+            roll_pool.append((name, adjusted_rarity))
 
         if not roll_pool:
             roll_pool.append(("Amber", max(1, int(2 * base_modifier * weather_modifier / luck_multiplier))))
 
         return roll_pool
 
+    def compute_outcome_distribution(self, roll_pool, shiny_chance):
+        # Exact odds of the rejection loop roll_once used to run: entries are
+        # tried in uniformly random order, a failed entry is dropped until one
+        # is left, and the last one gets every remaining attempt (9n + 1 of
+        # the 10n budget) before falling back to Amber.
+        size = len(roll_pool)
+        success = [1.0 / rarity for _, rarity in roll_pool]
+        last_attempts = 9 * size + 1
+        binomials = [1]
+        for k in range(1, size):
+            binomials.append(binomials[-1] * (size - k) // k)
+
+        outcomes = []
+        fallback = 0.0
+        for i, (name, _) in enumerate(roll_pool):
+            # elementary symmetric sums of the other entries' failure odds
+            sums = [1.0] + [0.0] * (size - 1)
+            for j in range(size):
+                if j != i:
+                    fail = 1.0 - success[j]
+                    for k in range(size - 1, 0, -1):
+                        sums[k] += sums[k - 1] * fail
+            early = sum(sums[k] / binomials[k] for k in range(size - 1)) * success[i]
+            last_fail = (1.0 - success[i]) ** last_attempts
+            late = sums[size - 1] * (1.0 - last_fail)
+            fallback += sums[size - 1] * last_fail / size
+
+            chance = (early + late) / size
+            code = self.aura_index[name]
+            outcomes.append((code, chance * (1 - 1 / shiny_chance)))
+            outcomes.append((code | SHINY_BIT, chance / shiny_chance))
+
+        outcomes.append((self.aura_index["Amber"], fallback))
+        return outcomes
+
+    def get_outcome_table(self, biome=None, weather=None, luck_multiplier=None, shiny_chance=None):
+        biome = self.current_biome if biome is None else biome
+        weather = self.current_weather if weather is None else weather
+        if luck_multiplier is None:
+            luck_multiplier = self.luck_multiplier
+        if shiny_chance is None:
+            shiny_chance = self.shiny_chance
+
+        key = (biome, weather, luck_multiplier, shiny_chance)
+        table = self.outcome_tables.get(key)
+        if table is None:
+            roll_pool = self.calculate_roll_outcome(biome, weather, luck_multiplier)
+            table = AliasTable(self.compute_outcome_distribution(roll_pool, shiny_chance))
+            self.outcome_table_builds += 1
+            self.outcome_tables[key] = table
+            if len(self.outcome_tables) > OUTCOME_TABLE_CACHE_SIZE:
+                self.outcome_tables.popitem(last=False)
+        else:
+            self.outcome_tables.move_to_end(key)
+        return table
+
+    def outcome_odds(self, biome=None, weather=None, luck_multiplier=None, shiny_chance=None):
+        """Exact chance of each outcome code on one roll in the given state."""
+        biome = self.current_biome if biome is None else biome
+        weather = self.current_weather if weather is None else weather
+        if luck_multiplier is None:
+            luck_multiplier = self.get_luck_multiplier()
+        if shiny_chance is None:
+            shiny_chance = self.get_shiny_chance()
+        roll_pool = self.calculate_roll_outcome(biome, weather, luck_multiplier)
+        odds = Counter()
+        for code, chance in self.compute_outcome_distribution(roll_pool, shiny_chance):
+            odds[code] += chance
+        return odds
+
+    def state_transitions(self):
+        # Every roll first moves biome and weather independently: with a
+        # 1-in-N chance each is redrawn uniformly (possibly to the same one).
+        states = [(biome, weather) for biome in self.biomes for weather in self.weather_types]
+        biome_move = 1 / BIOME_CHANGE_ODDS / len(self.biomes)
+        weather_move = 1 / WEATHER_CHANGE_ODDS / len(self.weather_types)
+        transitions = []
+        for biome, weather in states:
+            row = []
+            for next_biome, next_weather in states:
+                biome_chance = biome_move + (1 - 1 / BIOME_CHANGE_ODDS if next_biome == biome else 0)
+                weather_chance = weather_move + (1 - 1 / WEATHER_CHANGE_ODDS if next_weather == weather else 0)
+                row.append(biome_chance * weather_chance)
+            transitions.append(row)
+        return states, transitions
+
+    def expected_rolls_to_obtain(self, name, biome=None, weather=None, luck_multiplier=None, shiny_chance=None):
+        # Biome and weather follow their per-roll Markov chain from the given
+        # state; luck and shiny chance stay at their current values.
+        biome = self.current_biome if biome is None else biome
+        weather = self.current_weather if weather is None else weather
+        if luck_multiplier is None:
+            luck_multiplier = self.get_luck_multiplier()
+        if shiny_chance is None:
+            shiny_chance = self.get_shiny_chance()
+        if name.startswith("Shiny "):
+            codes = [self.aura_index[name[len("Shiny "):]] | SHINY_BIT]
+        else:
+            codes = [self.aura_index[name], self.aura_index[name] | SHINY_BIT]
+
+        states, transitions = self.state_transitions()
+        hits = []
+        for state_biome, state_weather in states:
+            odds = self.outcome_odds(state_biome, state_weather, luck_multiplier, shiny_chance)
+            hits.append(sum(odds[code] for code in codes))
+        if not any(hits):
+            return math.inf
+
+        # E(s) = 1 + sum over s' of P(s, s') * (1 - hit(s')) * E(s')
+        size = len(states)
+        matrix = [
+            [(1.0 if i == j else 0.0) - transitions[i][j] * (1 - hits[j]) for j in range(size)]
+            for i in range(size)
+        ]
+        expected = solve_linear(matrix, [1.0] * size)
+        return expected[states.index((biome, weather))]
+
+    def outcome_name(self, code):
+        name = self.aura_names[code & ~SHINY_BIT]
+        return f"Shiny {name}" if code & SHINY_BIT else name
+
+    def record_roll(self, code):
+        name = self.outcome_name(code)
+        self.change_aura_count(name, 1)
+        self.roll_log.append_code(self.total_rolls, code)
+
     def roll_once(self):
+        if self.metrics.enabled:
+            return self.roll_once_timed()
         self.refresh_daily()
         self.apply_item_effects()
         self.total_rolls += 1
         self.update_biome_and_weather()
 
-        roll_pool = self.calculate_roll_outcome()
-        
-        attempts = 0
-        max_attempts = len(roll_pool) * 10
-        
-        while roll_pool and attempts < max_attempts:
-            attempts += 1
-            name, adjusted_rarity = random.choice(roll_pool)
-            
-            if random.randint(1, adjusted_rarity) == 1:
-                original_rarity = self.auras[name][0]
-                
-                shiny_chance = 250
-                if "shiny_boost" in [effect for effect, _ in self.item_effects.items() if self.item_effects[effect] > time.time()]:
-                    shiny_chance = 100
-                elif "godmode" in [effect for effect, _ in self.item_effects.items() if self.item_effects[effect] > time.time()]:
-                    shiny_chance = 10
-                
-                if random.randint(1, shiny_chance) == 1:
-                    shiny_name = f"Shiny {name}"
-                    self.shiny_aura_counts[shiny_name] += 1
-                    self.roll_log.append((self.total_rolls, shiny_name))
-                    print(f"✨🌟 SHINY AURA! You rolled: {shiny_name} (1 in {original_rarity:,}) 🌟✨")
-                    if original_rarity >= 1000000:
-                        print("🎆 BEYOND LEGENDARY SHINY! THE UNIVERSE TREMBLES! 🎆")
-                    elif original_rarity >= 100000:
-                        print("🌌 MYTHICAL SHINY! REALITY BENDS! 🌌")
-                    elif original_rarity >= 10000:
-                        print("💫 LEGENDARY SHINY! INCREDIBLE! 💫")
-                    elif original_rarity >= 1000:
-                        print("🔥 ULTRA RARE SHINY! AMAZING! 🔥")
-                else:
-                    self.aura_counts[name] += 1
-                    self.roll_log.append((self.total_rolls, name))
-                    print(f"🎲 You rolled: {name} (1 in {original_rarity:,})")
-                    
-                    if original_rarity >= 5000000:
-                        print("🎆 OMNIPOTENT PULL! THE COSMOS ACKNOWLEDGES YOU! 🎆")
-                    elif original_rarity >= 1000000:
-                        print("🌟 DIVINE PULL! THE GODS SMILE UPON YOU! 🌟")
-                    elif original_rarity >= 100000:
-                        print("🌌 MYTHICAL PULL! LEGENDS WILL BE TOLD! 🌌")
-                    elif original_rarity >= 10000:
-                        print("💫 LEGENDARY PULL! EXTRAORDINARY! 💫")
-                    elif original_rarity >= 1000:
-                        print("⚡ ULTRA RARE PULL! INCREDIBLE! ⚡")
-                    elif original_rarity >= 100:
-                        print("🔥 RARE PULL! GREAT JOB! 🔥")
-                
-                self.check_quests()
-                self.check_achievements()
-                return
+        code = self.get_outcome_table().draw(self.rng.random())
+        self.record_roll(code)
+        self.events.emit(
+            "roll",
+            roll_number=self.total_rolls,
+            name=self.outcome_name(code),
+            rarity=self.aura_rarities[code & ~SHINY_BIT],
+            shiny=bool(code & SHINY_BIT),
+        )
+        self.check_quests()
+        self.check_achievements()
+        self.mark_dirty()
+        return code
+
+    def roll_once_timed(self):
+        # roll_once with a timestamp between phases; draws the same numbers
+        metrics = self.metrics
+        clock = time.perf_counter_ns
+        start = clock()
+        self.refresh_daily()
+        t1 = clock()
+        metrics.observe("refresh_daily", t1 - start)
+        self.apply_item_effects()
+        t2 = clock()
+        metrics.observe("apply_item_effects", t2 - t1)
+        self.total_rolls += 1
+        self.update_biome_and_weather()
+        t3 = clock()
+        metrics.observe("update_biome_and_weather", t3 - t2)
+
+        builds = self.outcome_table_builds
+        table = self.get_outcome_table()
+        t4 = clock()
+        # a cache miss ran calculate_roll_outcome and the exact distribution
+        if self.outcome_table_builds != builds:
+            metrics.counters["outcome_table_builds"] += 1
+            metrics.observe("calculate_roll_outcome", t4 - t3)
+        else:
+            metrics.observe("outcome_table_lookup", t4 - t3)
+        slot = table.draw_slot(self.rng.random())
+        code = table.codes[slot]
+        if slot == len(table.codes) - 1:
+            # the last slot is the rejection loop's Amber fallback
+            metrics.counters["fallback_draws"] += 1
+        t5 = clock()
+        metrics.observe("sample", t5 - t4)
+
+        self.record_roll(code)
+        self.events.emit(
+            "roll",
+            roll_number=self.total_rolls,
+            name=self.outcome_name(code),
+            rarity=self.aura_rarities[code & ~SHINY_BIT],
+            shiny=bool(code & SHINY_BIT),
+        )
+        t6 = clock()
+        metrics.observe("record_roll", t6 - t5)
+        self.check_quests()
+        t7 = clock()
+        metrics.observe("check_quests", t7 - t6)
+        self.check_achievements()
+        end = clock()
+        metrics.observe("check_achievements", end - t7)
+        metrics.observe("roll_once", end - start)
+        metrics.counters["rolls"] += 1
+        self.mark_dirty()
+        return code
+
+    def is_notable(self, code):
+        return self.content.notable_codes[code]
+
+    def simulate_block_python(self, amount):
+        codes = []
+        shiny_chance = self.get_shiny_chance()
+        luck_multiplier = self.get_luck_multiplier()
+        for _ in range(amount):
+            self.update_biome_and_weather(announce=False)
+            table = self.get_outcome_table(luck_multiplier=luck_multiplier, shiny_chance=shiny_chance)
+            codes.append(table.draw(self.rng.random()))
+        return codes
+
+    def simulate_states_numpy(self, current, names, change_odds, amount):
+        # Each roll keeps the previous state unless a 1-in-N change fires, so
+        # forward-filling the index of the last change gives the state per roll.
+        changed = self.rng.integers_array(1, change_odds + 1, amount) == 1
+        picks = self.rng.integers_array(0, len(names), amount)
+        last_change = np.where(changed, np.arange(amount), -1)
+        np.maximum.accumulate(last_change, out=last_change)
+        return np.where(last_change >= 0, picks[last_change], names.index(current))
+
+    def simulate_block_numpy(self, amount):
+        biome_names = self.content.biome_names
+        biome_seq = self.simulate_states_numpy(self.current_biome, biome_names, BIOME_CHANGE_ODDS, amount)
+        weather_seq = self.simulate_states_numpy(self.current_weather, self.weather_types, WEATHER_CHANGE_ODDS, amount)
+
+        previous = np.concatenate(([biome_names.index(self.current_biome)], biome_seq[:-1]))
+        moves = np.flatnonzero(biome_seq != previous)
+        if len(moves):
+            timestamp = datetime.now().isoformat()
+            for pos in moves:
+                biome = biome_names[biome_seq[pos]]
+                self.visited_biomes.add(biome)
+                self.visit_log.append((timestamp, biome))
+        self.current_biome = biome_names[biome_seq[-1]]
+        self.current_weather = self.weather_types[weather_seq[-1]]
+
+        shiny_chance = self.get_shiny_chance()
+        luck_multiplier = self.get_luck_multiplier()
+        states = biome_seq * len(self.weather_types) + weather_seq
+        codes = np.empty(amount, dtype=np.uint8)
+        for state in np.unique(states):
+            mask = states == state
+            biome = biome_names[state // len(self.weather_types)]
+            weather = self.weather_types[state % len(self.weather_types)]
+            table = self.get_outcome_table(biome, weather, luck_multiplier, shiny_chance)
+            codes[mask] = table.sample(self.rng, int(mask.sum()))
+        return codes
+
+    def record_batch(self, first_roll, count, counts, notable):
+        # Adds a block's per-code totals (256 entries, shiny codes with
+        # SHINY_BIT set) to the aura counts and reports its notable
+        # (roll_number, code) pairs; the roll log is the caller's job.
+        for index, name in enumerate(self.aura_names):
+            self.change_aura_count(name, counts[index])
+            self.change_aura_count(f"Shiny {name}", counts[index | SHINY_BIT])
+        self.events.emit(
+            "roll_batch",
+            first_roll=first_roll,
+            count=count,
+            notable=[
+                (roll_number, self.outcome_name(code), self.aura_rarities[code & ~SHINY_BIT], bool(code & SHINY_BIT))
+                for roll_number, code in notable
+            ],
+        )
+
+    def roll_batch(self, amount, progress=None):
+        # progress(done, amount) runs after each block; returning True stops
+        # the run there with every finished block recorded
+        notable_rolls = []
+        done = 0
+        if np is not None:
+            notable_table = np.array(self.content.notable_codes)
+
+        metrics = self.metrics if self.metrics.enabled else None
+        while done < amount:
+            if metrics:
+                start = time.perf_counter_ns()
+            self.refresh_daily()
+            self.apply_item_effects()
+            block = min(BATCH_BLOCK_SIZE, amount - done)
+            first_roll = self.total_rolls + 1
+
+            if np is not None:
+                codes = self.simulate_block_numpy(block)
+                counts = np.bincount(codes, minlength=256).tolist()
+                notable = [(first_roll + i, int(codes[i])) for i in np.flatnonzero(notable_table[codes]).tolist()]
             else:
-                if len(roll_pool) > 1:
-                    roll_pool.remove((name, adjusted_rarity))
+                codes = self.simulate_block_python(block)
+                counts = [0] * 256
+                for code in codes:
+                    counts[code] += 1
+                notable = [(first_roll + i, code) for i, code in enumerate(codes) if self.is_notable(code)]
+            if metrics:
+                simulated = time.perf_counter_ns()
+                metrics.observe("batch_simulate", simulated - start)
+
+            self.roll_log.extend_codes(first_roll, codes)
+            self.record_batch(first_roll, block, counts, notable)
+            notable_rolls.extend(notable)
+
+            self.total_rolls += block
+            done += block
+            if metrics:
+                recorded = time.perf_counter_ns()
+                metrics.observe("batch_record", recorded - simulated)
+            self.check_quests()
+            self.check_achievements()
+            if metrics:
+                metrics.observe("batch_goals", time.perf_counter_ns() - recorded)
+                metrics.counters["rolls"] += block
+            self.mark_dirty()
+            if progress and progress(done, amount):
+                break
+        return notable_rolls
+
+    def sample_redraws(self, generator, change_odds, choices, amount):
+        # offsets of the rolls where a 1-in-N redraw fires, and what each picks
+        chance = 1 / change_odds
+        expected = amount * chance
+        offsets = np.cumsum(generator.geometric(chance, int(expected + 6 * math.sqrt(expected)) + 16)) - 1
+        while offsets[-1] < amount:
+            more = offsets[-1] + np.cumsum(generator.geometric(chance, len(offsets)))
+            offsets = np.concatenate((offsets, more))
+        offsets = offsets[offsets < amount]
+        return offsets, generator.integers(0, choices, len(offsets))
+
+    def sample_segments(self, generator, biome, weather, amount):
+        biome_at, biome_picks = self.sample_redraws(generator, BIOME_CHANGE_ODDS, len(self.biomes), amount)
+        weather_at, weather_picks = self.sample_redraws(generator, WEATHER_CHANGE_ODDS, len(self.weather_types), amount)
+        # Merge both redraw lists (already sorted, so the stable sort is a
+        # merge) and forward-fill each column from its last redraw.
+        offsets = np.concatenate(([0], biome_at, weather_at))
+        biomes = np.concatenate(([biome], biome_picks, np.full(len(weather_at), -1)))
+        weathers = np.concatenate(([weather], np.full(len(biome_at), -1), weather_picks))
+        order = np.argsort(offsets, kind="stable")
+        offsets, biomes, weathers = offsets[order], biomes[order], weathers[order]
+        events = np.arange(len(offsets))
+        biomes = biomes[np.maximum.accumulate(np.where(biomes >= 0, events, 0))]
+        weathers = weathers[np.maximum.accumulate(np.where(weathers >= 0, events, 0))]
+        # the last event at an offset holds the state the roll there uses
+        last = np.append(offsets[1:] != offsets[:-1], True)
+        starts, biomes, weathers = offsets[last], biomes[last], weathers[last]
+        lengths = np.diff(np.append(starts, amount))
+        return starts, lengths, biomes, weathers
+
+    def roll_aggregate(self, amount, progress=None):
+        # Same distribution as roll_batch, sampled as outcome counts per
+        # biome/weather state; only notable rolls get a position in roll_log.
+        if np is None:
+            return self.roll_batch(amount, progress)
+
+        generator = self.rng.numpy_generator()
+        biome_names = self.content.biome_names
+        weather_count = len(self.weather_types)
+        notable_table = np.array(self.content.notable_codes)
+
+        state_odds = {}
+        odds_key = None
+        notable_rolls = []
+        done = 0
+        while done < amount:
+            self.refresh_daily()
+            self.apply_item_effects()
+            # effects can start or lapse between windows
+            if odds_key != (self.luck_multiplier, self.shiny_chance):
+                odds_key = (self.luck_multiplier, self.shiny_chance)
+                state_odds = {}
+            window = min(AGGREGATE_WINDOW, amount - done)
+            first_roll = self.total_rolls + 1
+            starts, lengths, biomes, weathers = self.sample_segments(
+                generator, self.content.biome_index[self.current_biome], self.content.weather_index[self.current_weather], window
+            )
+            states = (biomes * weather_count + weathers).astype(np.uint16)
+            occupancy = np.bincount(states, weights=lengths, minlength=len(biome_names) * weather_count).astype(np.int64)
+
+            # Rolls of one state are exchangeable, so each state needs a single
+            # multinomial draw; notable rolls then take uniformly random slots
+            # among that state's rolls, numbered in state-sorted order.
+            order = np.argsort(states, kind="stable")
+            slot_ends = np.cumsum(lengths[order])
+            state_slots = np.concatenate(([0], np.cumsum(occupancy)))
+            counts = np.zeros(256, dtype=np.int64)
+            slots = []
+            slot_codes = []
+            for state in np.flatnonzero(occupancy).tolist():
+                if state not in state_odds:
+                    odds = self.outcome_odds(
+                        biome_names[state // weather_count], self.weather_types[state % weather_count],
+                        self.luck_multiplier, self.shiny_chance
+                    )
+                    chances = np.array(list(odds.values()))
+                    state_odds[state] = (np.array(list(odds.keys())), chances / chances.sum())
+                codes, chances = state_odds[state]
+                drawn = generator.multinomial(occupancy[state], chances)
+                counts[codes] += drawn
+                hits = drawn * notable_table[codes]
+                if hits.any():
+                    slots.append(state_slots[state] + generator.choice(occupancy[state], hits.sum(), replace=False))
+                    slot_codes.append(np.repeat(codes, hits))
+
+            notable = []
+            if slots:
+                slots = np.concatenate(slots)
+                segment_index = np.searchsorted(slot_ends, slots, side="right")
+                segments = order[segment_index]
+                positions = starts[segments] + slots - (slot_ends[segment_index] - lengths[segments])
+                ordering = np.argsort(positions)
+                roll_numbers = first_roll + positions[ordering]
+                codes = np.concatenate(slot_codes)[ordering].astype(np.uint8)
+                self.roll_log.extend_records(roll_numbers, codes)
+                self.roll_log.index_records(roll_numbers, codes)
+                notable = list(zip(roll_numbers.tolist(), codes.tolist()))
+
+            # Only a biome's first visit is logged; one entry per move would
+            # grow the visit log with the number of rolls.
+            timestamp = datetime.now().isoformat()
+            for index in np.flatnonzero(np.bincount(biomes, minlength=len(biome_names))).tolist():
+                biome = biome_names[index]
+                if biome not in self.visited_biomes:
+                    self.visited_biomes.add(biome)
+                    self.visit_log.append((timestamp, biome))
+            self.current_biome = biome_names[biomes[-1]]
+            self.current_weather = self.weather_types[weathers[-1]]
+
+            self.record_batch(first_roll, window, counts.tolist(), notable)
+            notable_rolls.extend(notable)
+
+            self.total_rolls += window
+            done += window
+            self.check_quests()
+            self.check_achievements()
+            self.mark_dirty()
+            if progress and progress(done, amount):
+                break
+        return notable_rolls
+
+    def roll_parallel(self, amount, workers=None, seed=None, progress=None):
+        self.refresh_daily()
+        self.apply_item_effects()
+        snapshot = {
+            "current_biome": self.current_biome,
+            "current_weather": self.current_weather,
+            "item_effects": dict(self.item_effects),
+            "today_date": self.today_date,
+            "rng_kind": self.rng.kind
+        }
+        if seed is None:
+            # unseeded runs still follow the game's own stream
+            seed = int(self.rng.random() * (1 << 53))
+        shard_count = math.ceil(amount / PARALLEL_SHARD_SIZE)
+        shard_sizes = [PARALLEL_SHARD_SIZE] * (shard_count - 1) + [amount - PARALLEL_SHARD_SIZE * (shard_count - 1)]
+        if np is not None:
+            seeds = [int(child.generate_state(1, np.uint64)[0]) for child in np.random.SeedSequence(seed).spawn(shard_count)]
+        else:
+            seeder = random.Random(seed)
+            seeds = [seeder.getrandbits(64) for _ in range(shard_count)]
+
+        notable_rolls = []
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=ignore_interrupts) as executor:
+            # map() yields in submission order, so shards are merged in the
+            # same order for a given seed no matter which worker finishes first.
+            for shard in executor.map(roll_shard, [snapshot] * shard_count, shard_sizes, seeds):
+                offset = self.total_rolls
+                self.roll_log.extend_indexed(offset + 1, shard["codes"], shard["index"])
+                self.visit_log.extend(shard["visit_log"])
+                self.visited_biomes.update(shard["visited_biomes"])
+                self.current_biome = shard["current_biome"]
+                self.current_weather = shard["current_weather"]
+
+                notable = [(offset + roll_number, code) for roll_number, code in shard["notable"]]
+                self.record_batch(offset + 1, len(shard["codes"]), shard["counts"], notable)
+                notable_rolls.extend(notable)
+                self.total_rolls += len(shard["codes"])
+                done += len(shard["codes"])
+                if progress and progress(done, amount):
+                    # drop the shards still queued; the merged ones stay
+                    executor.shutdown(cancel_futures=True)
+                    break
 
-        self.aura_counts["Amber"] += 1
-        self.roll_log.append((self.total_rolls, "Amber"))
-        print("🎲 You rolled: Amber (1 in 2)")
         self.check_quests()
         self.check_achievements()
+        self.mark_dirty()
+        return notable_rolls
 
     def roll_multiple(self):
         try:
-            amount = int(input("How many times do you want to roll? "))
+            amount = int(self.prompt("How many times do you want to roll? "))
             if amount <= 0:
                 print("Please enter a positive number.")
                 return
-            if amount > 10000:
-                confirm = input(f"Rolling {amount} times might take a while. Continue? (y/n): ")
-                if confirm.lower() != 'y':
-                    return
         except ValueError:
             print("Invalid number.")
             return
 
-        print(f"\n🎲 Rolling {amount} times...")
+        print(f"\n🎲 Rolling {amount} times... (Ctrl-C stops early and keeps the rolls so far)")
         start_time = time.time()
-        notable_rolls = []
-        
-        for i in range(amount):
-            if i > 0 and i % 100 == 0:
-                print(f"Progress: {i}/{amount} rolls completed...")
-            
-            old_total = self.total_rolls
-            self.roll_once()
-            
-            if self.roll_log:
-                last_roll = self.roll_log[-1]
-                roll_name = last_roll[1]
-                
-                if "Shiny" in roll_name:
-                    notable_rolls.append(f"✨ {roll_name} (Roll #{last_roll[0]})")
-                elif any(roll_name == name for name, (rarity, _) in self.auras.items() if rarity >= 1000):
-                    rarity = self.auras[roll_name][0]
-                    notable_rolls.append(f"🔥 {roll_name} (1 in {rarity:,}) (Roll #{last_roll[0]})")
-            
-            time.sleep(0.01)
+        first_roll = self.total_rolls
+
+        summary = SummarySink()
+        reporter = ProgressReporter(summary)
+        console, self.events = self.events, summary
+        try:
+            with reporter.listen():
+                if amount >= AGGREGATE_THRESHOLD and np is not None:
+                    self.roll_aggregate(amount, reporter)
+                elif amount >= PARALLEL_THRESHOLD and (os.cpu_count() or 1) > 1:
+                    self.roll_parallel(amount, progress=reporter)
+                else:
+                    self.roll_batch(amount, reporter)
+        finally:
+            self.events = console
+            reporter.finish()
         
         end_time = time.time()
         duration = end_time - start_time
         
-        print(f"\n✅ Completed {amount} rolls in {duration:.2f} seconds!")
+        rolled = self.total_rolls - first_roll
+        if rolled < amount:
+            print(f"\n🛑 Stopped after {rolled:,} of {amount:,} rolls in {duration:.2f} seconds. Every completed roll was kept.")
+        else:
+            print(f"\n✅ Completed {amount} rolls in {duration:.2f} seconds!")
         
+        notable_rolls = summary.notable_rolls
         if notable_rolls:
             print(f"\n🎉 Notable Rolls ({len(notable_rolls)}):")
-            for roll in notable_rolls[-10:]:
-                print(f"   {roll}")
+            for roll_number, roll_name, rarity, shiny in notable_rolls[-10:]:
+                if shiny:
+                    print(f"   ✨ {roll_name} (Roll #{roll_number})")
+                else:
+                    print(f"   🔥 {roll_name} (1 in {rarity:,}) (Roll #{roll_number})")
             if len(notable_rolls) > 10:
                 print(f"   ... and {len(notable_rolls) - 10} more!")
+        summary.replay(console)
         
-        input("\nPress Enter to continue...")
+        self.prompt("\nPress Enter to continue...")
+
+    def roll_span(self, code):
+        first, last = self.roll_log.first_rolls[code], self.roll_log.last_rolls[code]
+        if self.is_notable(code):
+            return f"    First: Roll #{first:,} | Latest: Roll #{last:,}"
+        # batch rolls only log notable pulls, so common auras show the logged ones
+        return f"    First logged: Roll #{first:,} | Last logged: Roll #{last:,}"
 
     def view_collection(self):
         print("\n🎨 === Your Aura Collection ===")
@@ -716,7 +2914,7 @@ class PythonRNGGame:
         regular_collection = []
         shiny_collection = []
         
-        for name, (rarity, locations) in sorted(self.auras.items(), key=lambda x: x[1][0]):
+        for name, (rarity, locations) in self.sorted_auras:
             count = self.aura_counts[name]
             shiny_count = self.shiny_aura_counts.get(f"Shiny {name}", 0)
             
@@ -725,24 +2923,28 @@ class PythonRNGGame:
                 location_str = ", ".join(locations)
                 regular_collection.append(f"📜 {name} ({rarity_str}) - Count: {count:,}")
                 regular_collection.append(f"    Locations: {location_str}")
+                code = self.aura_index[name]
+                if self.roll_log.code_counts[code]:
+                    regular_collection.append(self.roll_span(code))
                 
             if shiny_count > 0:
                 rarity_str = f"1 in {rarity:,}"
                 location_str = ", ".join(locations)
                 shiny_collection.append(f"✨ Shiny {name} ({rarity_str}) - Count: {shiny_count:,}")
                 shiny_collection.append(f"    Locations: {location_str}")
+                code = self.aura_index[name] | SHINY_BIT
+                if self.roll_log.code_counts[code]:
+                    shiny_collection.append(self.roll_span(code))
         
         if not regular_collection and not shiny_collection:
             print("Your collection is empty. Start rolling to collect auras!")
         else:
             total_regular = sum(self.aura_counts.values())
             total_shiny = sum(self.shiny_aura_counts.values())
-            unique_regular = len([a for a in self.aura_counts if self.aura_counts[a] > 0])
-            unique_shiny = len([a for a in self.shiny_aura_counts if self.shiny_aura_counts[a] > 0])
             
             print(f"📊 Collection Stats:")
-            print(f"   Regular Auras: {total_regular:,} total, {unique_regular}/{len(self.auras)} unique")
-            print(f"   Shiny Auras: {total_shiny:,} total, {unique_shiny}/{len(self.auras)} unique")
+            print(f"   Regular Auras: {total_regular:,} total, {self.unique_auras}/{len(self.auras)} unique")
+            print(f"   Shiny Auras: {total_shiny:,} total, {self.unique_shinies}/{len(self.auras)} unique")
             print()
             
             if regular_collection:
@@ -756,7 +2958,7 @@ class PythonRNGGame:
                 for item in shiny_collection:
                     print(f"   {item}")
         
-        input("\nPress Enter to continue...")
+        self.prompt("\nPress Enter to continue...")
 
     def view_biome_info(self):
         print(f"\n🌍 === Biome Information ===")
@@ -776,24 +2978,31 @@ class PythonRNGGame:
             current = "📍" if weather == self.current_weather else "  "
             print(f"   {current} {weather}")
         
-        print(f"\n📈 Available Auras in {self.current_biome}:")
-        available_auras = [(name, rarity) for name, (rarity, locations) in self.auras.items() 
-                          if self.current_biome in locations]
-        available_auras.sort(key=lambda x: x[1])
+        print(f"\n📈 Available Auras in {self.current_biome} ({self.current_weather}):")
+        odds = self.outcome_odds()
+        available_auras = [
+            (name, odds[index] + odds[index | SHINY_BIT], odds[index | SHINY_BIT])
+            for index, name in enumerate(self.aura_names)
+            if odds[index] + odds[index | SHINY_BIT] > 0
+        ]
+        available_auras.sort(key=lambda x: -x[1])
         
-        for name, rarity in available_auras:
+        for name, chance, shiny_chance in available_auras:
             owned = self.aura_counts.get(name, 0)
             shiny_owned = self.shiny_aura_counts.get(f"Shiny {name}", 0)
             status = "✅" if owned > 0 else "❌"
             shiny_status = "✨" if shiny_owned > 0 else "  "
-            print(f"   {status}{shiny_status} {name} (1 in {rarity:,})")
+            shiny_odds = f"shiny 1 in {1 / shiny_chance:,.0f}" if shiny_chance else "fallback, no shiny"
+            print(f"   {status}{shiny_status} {name} (1 in {1 / chance:,.1f}, {shiny_odds})")
+            if not owned and not shiny_owned:
+                print(f"        Expected rolls to obtain: {self.expected_rolls_to_obtain(name):,.0f}")
         
-        input("\nPress Enter to continue...")
+        self.prompt("\nPress Enter to continue...")
 
     def view_active_effects(self):
         print("\n⚡ === Active Effects ===")
         
-        now = time.time()
+        now = self.clock()
         active_effects = []
         
         for item, expiry in self.item_effects.items():
@@ -803,8 +3012,9 @@ class PythonRNGGame:
                 seconds = remaining % 60
                 time_str = f"{minutes}m {seconds}s" if minutes > 0 else f"{seconds}s"
                 
-                if item in self.item_usage_effects:
-                    effect_type, _ = self.item_usage_effects[item]
+                effect = self.effect_for(item)
+                if effect:
+                    effect_type, _ = effect
                     effect_display = effect_type.replace('_', ' ').title()
                     active_effects.append(f"🔥 {item}: {effect_display} ({time_str} remaining)")
                 else:
@@ -819,34 +3029,30 @@ class PythonRNGGame:
             for effect in active_effects:
                 print(f"   {effect}")
         
-        input("\nPress Enter to continue...")
+        self.prompt("\nPress Enter to continue...")
 
     def show_leaderboard(self):
         print("\n🏆 === Personal Records ===")
         
-        if not self.roll_log:
+        if not self.total_rolls:
             print("No rolls recorded yet.")
-            input("\nPress Enter to continue...")
+            self.prompt("\nPress Enter to continue...")
             return
         
         rarest_regular = None
         rarest_shiny = None
         
-        for roll_num, aura_name in self.roll_log:
-            if "Shiny" in aura_name:
-                base_name = aura_name.replace("Shiny ", "")
-                if base_name in self.auras:
-                    rarity = self.auras[base_name][0]
-                    if rarest_shiny is None or rarity > rarest_shiny[1]:
-                        rarest_shiny = (aura_name, rarity, roll_num)
-            else:
-                if aura_name in self.auras:
-                    rarity = self.auras[aura_name][0]
-                    if rarest_regular is None or rarity > rarest_regular[1]:
-                        rarest_regular = (aura_name, rarity, roll_num)
+        for index, rarity in enumerate(self.aura_rarities):
+            if self.roll_log.code_counts[index]:
+                if rarest_regular is None or rarity > rarest_regular[1]:
+                    rarest_regular = (self.aura_names[index], rarity, self.roll_log.first_rolls[index])
+            if self.roll_log.code_counts[index | SHINY_BIT]:
+                if rarest_shiny is None or rarity > rarest_shiny[1]:
+                    rarest_shiny = (self.outcome_name(index | SHINY_BIT), rarity, self.roll_log.first_rolls[index | SHINY_BIT])
         
         print(f"🎲 Total Rolls: {self.total_rolls:,}")
-        print(f"🎯 Success Rate: {(len(self.roll_log) / max(self.total_rolls, 1) * 100):.2f}%")
+        notable_pulls = sum(count for count, notable in zip(self.roll_log.code_counts, self.content.notable_codes) if notable)
+        print(f"🎯 Success Rate: {(notable_pulls / self.total_rolls * 100):.2f}%")
         
         if rarest_regular:
             name, rarity, roll_num = rarest_regular
@@ -856,6 +3062,17 @@ class PythonRNGGame:
             name, rarity, roll_num = rarest_shiny
             print(f"✨ Rarest Shiny: {name} (1 in {rarity:,}) - Roll #{roll_num}")
         
+        if self.database is not None:
+            print(f"\n🌐 Top Players:")
+            for rank, (player, rolls) in enumerate(self.database.top_players(5), 1):
+                print(f"   {rank}. {player} - {rolls:,} rolls")
+            pulls = self.database.rarest_pulls(5)
+            if pulls:
+                print(f"\n💎 Rarest Saved Pulls:")
+                for aura_id, shiny, player, roll_num in pulls:
+                    name = self.outcome_name(aura_id | (SHINY_BIT if shiny else 0))
+                    print(f"   {player}: {name} (1 in {self.aura_rarities[aura_id]:,}) - Roll #{roll_num}")
+        
         recent_rolls = self.roll_log[-10:] if len(self.roll_log) >= 10 else self.roll_log
         if recent_rolls:
             print(f"\n📋 Recent Rolls:")
@@ -868,7 +3085,7 @@ class PythonRNGGame:
                     rarity = self.auras.get(aura_name, (0,))[0]
                     print(f"   Roll #{roll_num}: {aura_name} (1 in {rarity:,})")
         
-        input("\nPress Enter to continue...")
+        self.prompt("\nPress Enter to continue...")
 
     def show_help(self):
         print("\n❓ === Game Help ===")
@@ -890,27 +3107,41 @@ class PythonRNGGame:
         print("   • Complete quests for valuable rewards")
         print("   • Weather changes over time - some weather boosts rare finds")
         
-        input("\nPress Enter to continue...")
+        self.prompt("\nPress Enter to continue...")
 
     def show_menu(self):
         self.load_state()
+        if self.renderer is None:
+            self.renderer = ScreenRenderer()
+        renderer = self.renderer
+        renderer.invalidate()
         
         while True:
-            self.clear_screen()
-            self.refresh_daily()
-            self.apply_item_effects()
-            self.check_achievements()
+            # Expired effects, unlocks and autosave failures are held back
+            # and printed under the menu, since drawing it clears the screen.
+            summary = SummarySink()
+            console, self.events = self.events, summary
+            try:
+                if self.autosave is not None:
+                    self.autosave.poll()
+                self.refresh_daily()
+                self.apply_item_effects()
+                self.check_achievements()
+            finally:
+                self.events = console
             
             title_display = f" - {self.titles_earned[-1]}" if self.titles_earned else ""
             luck_mult = self.get_luck_multiplier()
             luck_display = f" (🍀 {luck_mult:.1f}x)" if luck_mult > 1 else ""
             
-            print("=" * 80)
-            print(f"🎲 PYTHON RNG ULTIMATE EDITION{title_display} 🎲")
-            print("=" * 80)
-            print(f"🌍 Biome: {self.current_biome} | 🌤️ Weather: {self.current_weather}{luck_display}")
-            print(f"🎯 Total Rolls: {self.total_rolls:,} | 🎭 Unique Auras: {len([a for a in self.aura_counts if self.aura_counts[a] > 0])}/{len(self.auras)}")
-            print("=" * 80)
+            screen = [
+                "=" * 80,
+                f"🎲 PYTHON RNG ULTIMATE EDITION{title_display} 🎲",
+                "=" * 80,
+                f"🌍 Biome: {self.current_biome} | 🌤️ Weather: {self.current_weather}{luck_display}",
+                f"🎯 Total Rolls: {self.total_rolls:,} | 🎭 Unique Auras: {self.unique_auras}/{len(self.auras)}",
+                "=" * 80
+            ]
             
             menu_options = [
                 "🎲 Roll Once",
@@ -930,15 +3161,25 @@ class PythonRNGGame:
                 "🚪 Exit Game"
             ]
             
-            for i, option in enumerate(menu_options, 1):
-                print(f"{i:2d}. {option}")
-            
-            print("=" * 80)
-            choice = input("🎮 Choose an option: ").strip()
+            screen.extend(f"{i:2d}. {option}" for i, option in enumerate(menu_options, 1))
+            screen.append("=" * 80)
+            renderer.draw(screen)
+            printed = getattr(console, "lines", None)
+            summary.replay(console)
+            choice = self.prompt("🎮 Choose an option: ").strip()
 
+            # Roll Once and bad input leave the menu on screen with a few
+            # lines under it, so the next draw only rewrites what changed.
+            # Everything else takes the screen over and needs a full repaint.
+            renderer.invalidate()
+            below = console.lines - printed if printed is not None else 0
             if choice == "1":
                 self.roll_once()
-                input("\nPress Enter to continue...")
+                self.prompt("\nPress Enter to continue...")
+                if printed is not None:
+                    # the messages, the prompt, the roll's lines, the blank
+                    # line and "Press Enter"
+                    renderer.keep(screen, console.lines - printed + 3)
             elif choice == "2":
                 self.roll_multiple()
             elif choice == "3":
@@ -963,10 +3204,10 @@ class PythonRNGGame:
                 self.show_help()
             elif choice == "13":
                 self.save_state()
-                input("\nPress Enter to continue...")
+                self.prompt("\nPress Enter to continue...")
             elif choice == "14":
                 self.load_state()
-                input("\nPress Enter to continue...")
+                self.prompt("\nPress Enter to continue...")
             elif choice == "15":
                 print("🎉 Thanks for playing Python RNG Ultimate Edition!")
                 print("🌟 Your adventure ends here, but legends never die!")
@@ -974,18 +3215,380 @@ class PythonRNGGame:
                 break
             else:
                 print("❌ Invalid choice. Please try again.")
+                renderer.keep(screen, below + 2)
                 time.sleep(1)
 
+class ScreenRenderer:
+    # Paints menu frames with terminfo or ANSI escapes, rewriting only the lines
+    # that changed while the last frame is still on screen.
+    ANSI = ("\x1b[H\x1b[2J", "\x1b[{row};1H", "\x1b[K", "\x1b[J")
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.frame = None
+        self.codes = self.detect()
+
+    def detect(self):
+        try:
+            interactive = self.stream.isatty()
+        except (AttributeError, ValueError):
+            interactive = False
+        if not interactive or os.environ.get("TERM") == "dumb":
+            return None
+        if os.name == "nt":
+            return self.ANSI if self.enable_windows_ansi() else None
+        if curses is not None:
+            try:
+                curses.setupterm(fd=self.stream.fileno())
+                clear, cup, el, ed = (curses.tigetstr(cap) for cap in ("clear", "cup", "el", "ed"))
+            except (curses.error, OSError, ValueError):
+                return self.ANSI
+            if not (clear and cup and el and ed):
+                return None
+            return (clear.decode(), cup, el.decode(), ed.decode())
+        return self.ANSI
+
+    def enable_windows_ansi(self):
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11)
+            mode = ctypes.c_uint32()
+            if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+                return False
+            # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+            return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+        except (AttributeError, OSError):
+            return False
+
+    def move(self, row):
+        cup = self.codes[1]
+        if isinstance(cup, bytes):
+            return curses.tparm(cup, row, 0).decode()
+        return cup.format(row=row + 1)
+
+    def invalidate(self):
+        self.frame = None
+
+    def keep(self, frame, rows_below):
+        # The frame is still on screen if the rows printed under it since
+        # draw() did not scroll it off the top.
+        size = shutil.get_terminal_size()
+        # emoji outside the BMP take two columns
+        widths = (len(line) + sum(ord(c) > 0xFFFF for c in line) for line in frame)
+        fits = len(frame) + rows_below < size.lines and all(width <= size.columns for width in widths)
+        self.frame = list(frame) if fits and self.codes is not None else None
+
+    def draw(self, lines):
+        if self.codes is None:
+            self.stream.write("\n" + "\n".join(lines) + "\n")
+            self.stream.flush()
+            return
+        clear, _, erase_line, erase_below = self.codes
+        if self.frame is None:
+            out = [clear, "\n".join(lines), "\n"]
+        else:
+            out = [self.move(row) + line + erase_line for row, line in enumerate(lines)
+                   if row >= len(self.frame) or self.frame[row] != line]
+            # drop the old prompt, whatever was printed under it and any
+            # rows a longer previous frame used
+            out.append(self.move(len(lines)) + erase_below)
+        self.frame = list(lines)
+        self.stream.write("".join(out))
+        self.stream.flush()
+
+class Autosaver:
+    # Coalesced background saves: state is captured at most once per interval,
+    # by the game thread or, while it waits at a prompt, by the save thread, and
+    # the disk writes always run on the save thread.
+    def __init__(self, game, interval=AUTOSAVE_INTERVAL):
+        self.game = game
+        self.interval = interval
+        self.dirty = False
+        self.due = time.monotonic() + interval
+        self.job = None
+        self.waiting = False
+        self.capturing = False
+        self.stopping = False
+        self.error = None
+        self.saves = 0
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name="autosave", daemon=True)
+        self.thread.start()
+
+    def touch(self):
+        self.dirty = True
+        if self.job is None and time.monotonic() >= self.due:
+            self.submit()
+
+    def poll(self):
+        if self.dirty and self.job is None and time.monotonic() >= self.due:
+            self.submit()
+        if self.error is not None:
+            self.game.events.emit("autosave_failed", error=str(self.error))
+            self.error = None
+
+    def submit(self):
+        self.dirty = False
+        self.due = time.monotonic() + self.interval
+        job = self.game.prepare_save()
+        with self.condition:
+            self.job = job
+            self.condition.notify_all()
+
+    @contextlib.contextmanager
+    def idle(self):
+        # While the game waits on the player, nothing touches its state, so
+        # the save thread may take the snapshot itself once the interval is up.
+        with self.condition:
+            self.waiting = True
+            self.condition.notify_all()
+        try:
+            yield
+        finally:
+            with self.condition:
+                while self.capturing:
+                    self.condition.wait()
+                self.waiting = False
+
+    def capture_due(self):
+        return self.waiting and self.dirty and time.monotonic() >= self.due
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.job is None and not self.stopping and not self.capture_due():
+                    self.condition.wait(self.due - time.monotonic() if self.waiting and self.dirty else None)
+                if self.job is None and self.stopping:
+                    return
+                self.capturing = self.job is None
+                job = self.job
+            if job is None:
+                try:
+                    self.dirty = False
+                    self.due = time.monotonic() + self.interval
+                    job = self.game.prepare_save()
+                except Exception as e:
+                    self.error = e
+                    self.dirty = True
+                with self.condition:
+                    self.capturing = False
+                    self.job = job
+                    self.condition.notify_all()
+                if job is None:
+                    continue
+            try:
+                job()
+                self.saves += 1
+            except Exception as e:
+                self.error = e
+                self.dirty = True
+            with self.condition:
+                self.job = None
+                self.condition.notify_all()
+
+    def wait(self):
+        with self.condition:
+            while self.job is not None:
+                self.condition.wait()
+
+    def flush(self, force=False):
+        # Writes any unsaved changes on the calling thread and returns once
+        # they are on disk.
+        self.wait()
+        if self.dirty or force:
+            self.dirty = False
+            self.due = time.monotonic() + self.interval
+            self.game.prepare_save()()
+            self.saves += 1
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            with self.condition:
+                self.stopping = True
+                self.condition.notify_all()
+            self.thread.join()
+
+class SessionStore:
+    # LRU of loaded players; acquire() pins one until release(), and evicting
+    # an unpinned player saves it first if it changed.
+    def __init__(self, save_dir, max_sessions=SESSION_CACHE_SIZE, max_bytes=SESSION_CACHE_BYTES, database=None, metrics=None):
+        self.save_dir = Path(save_dir)
+        self.database = database
+        self.metrics = metrics
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.sessions = OrderedDict()
+        self.sizes = {}
+        self.total_bytes = 0
+        self.pins = Counter()
+        self.dirty = set()
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writebacks = 0
+
+    def save_path(self, player):
+        return self.save_dir / f"{player}.sav"
+
+    def estimate_bytes(self, game):
+        size = SESSION_BASE_BYTES + len(game.visit_log.entries) * 160 + len(game.outcome_tables) * 1024
+        if not isinstance(game.roll_log, MappedRollLog):
+            size += len(game.roll_log.aura_codes) * ROLL_RECORD.size
+        return size
+
+    def resize(self, player):
+        size = self.estimate_bytes(self.sessions[player])
+        self.total_bytes += size - self.sizes.get(player, 0)
+        self.sizes[player] = size
+
+    def acquire(self, player):
+        with self.lock:
+            game = self.sessions.get(player)
+            if game is not None:
+                self.hits += 1
+                self.sessions.move_to_end(player)
+            else:
+                self.misses += 1
+                if self.database is not None:
+                    game = PythonRNGGame(NullSink(), database=SQLiteSaves(self.database, player), metrics=self.metrics)
+                else:
+                    game = PythonRNGGame(NullSink(), save_file=self.save_path(player), metrics=self.metrics)
+                if game.save_exists():
+                    game.read_save()
+                self.sessions[player] = game
+                self.resize(player)
+            self.pins[player] += 1
+            self.evict()
+            return game
+
+    def release(self, player, dirty=False):
+        with self.lock:
+            self.pins[player] -= 1
+            if not self.pins[player]:
+                del self.pins[player]
+            if dirty:
+                self.dirty.add(player)
+            self.resize(player)
+            self.evict()
+
+    def save(self, player):
+        with self.lock:
+            self.sessions[player].write_save()
+            self.dirty.discard(player)
+            self.writebacks += 1
+
+    def evict(self):
+        for player in list(self.sessions):
+            if len(self.sessions) <= self.max_sessions and self.total_bytes <= self.max_bytes:
+                return
+            if player in self.pins:
+                continue
+            if player in self.dirty:
+                self.save(player)
+            game = self.sessions.pop(player)
+            self.total_bytes -= self.sizes.pop(player)
+            if isinstance(game.roll_log, MappedRollLog):
+                game.roll_log.close()
+            if game.database is not None:
+                game.database.close()
+            self.evictions += 1
+
+    def flush(self):
+        with self.lock:
+            for player in list(self.dirty):
+                self.save(player)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "sessions": len(self.sessions),
+                "estimated_bytes": self.total_bytes,
+                "pinned": len(self.pins),
+                "dirty": len(self.dirty),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "writebacks": self.writebacks
+            }
+
+def ignore_interrupts():
+    # Ctrl-C reaches the whole process group; only the parent decides
+    # whether it stops a parallel batch
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def roll_shard(snapshot, amount, seed):
+    game = PythonRNGGame(NullSink(), make_rng(snapshot["rng_kind"], seed))
+    game.today_date = snapshot["today_date"]
+    game.current_biome = snapshot["current_biome"]
+    game.current_weather = snapshot["current_weather"]
+    game.item_effects.update(snapshot["item_effects"])
+    game.recompute_effects()
+
+    counts = [0] * 256
+    notable = game.roll_batch(amount)
+    for index, name in enumerate(game.aura_names):
+        counts[index] = game.aura_counts[name]
+        counts[index | SHINY_BIT] = game.shiny_aura_counts[f"Shiny {name}"]
+    return {
+        "counts": counts,
+        "codes": game.roll_log.aura_codes.tobytes(),
+        "index": (game.roll_log.code_counts, game.roll_log.first_rolls, game.roll_log.last_rolls),
+        "notable": notable,
+        "visit_log": game.visit_log.entries,
+        "visited_biomes": game.visited_biomes,
+        "current_biome": game.current_biome,
+        "current_weather": game.current_weather
+    }
+
+def convert_save(json_file):
+    """Convert a JSON save (and its journal) to the binary save format."""
+    game = PythonRNGGame(NullSink(), save_file=Path(json_file).with_suffix(".sav"))
+    game.read_save()
+    game.save_journal.snapshot_stale = True
+    game.write_save()
+    game.roll_log.close()
+    return game.save_file
+
 def main():
     """Main entry point for the game."""
+    parser = argparse.ArgumentParser(description="Python RNG - Ultimate Edition")
+    parser.add_argument("--convert", metavar="SAVE_JSON", help="convert a JSON save to the binary format and exit")
+    parser.add_argument("--database", metavar="DB", help="keep the save in a shared SQLite database instead of a save file")
+    parser.add_argument("--player", default="player", help="profile name inside --database")
+    parser.add_argument("--metrics", metavar="FILE", help="time the hot paths and write the metrics here on exit (.json for JSON, else Prometheus text)")
+    parser.add_argument("--autosave", type=float, default=AUTOSAVE_INTERVAL, metavar="SECONDS",
+                        help="save changes in the background at most this often (0 turns autosave off)")
+    args = parser.parse_args()
+    if args.convert:
+        print(f"✅ Wrote {convert_save(args.convert)}")
+        return
+
+    metrics = Metrics(enabled=bool(args.metrics))
+    game = None
     try:
-        game = PythonRNGGame()
+        database = SQLiteSaves(args.database, args.player) if args.database else None
+        game = PythonRNGGame(database=database, metrics=metrics)
+        if args.autosave > 0:
+            game.autosave = Autosaver(game, args.autosave)
         game.show_menu()
     except KeyboardInterrupt:
-        print("\n\n🛑 Game interrupted. Your progress has been saved!")
+        print("\n\n🛑 Game interrupted.")
     except Exception as e:
         print(f"\n❌ An unexpected error occurred: {e}")
         print("🔧 Please report this issue if it persists.")
+    finally:
+        if game is not None and game.autosave is not None:
+            try:
+                game.autosave.close()
+                print("💾 Your progress has been saved!")
+            except Exception as e:
+                print(f"❌ Final save failed: {e}")
+        if args.metrics:
+            metrics.export(args.metrics)
 
 if __name__ == "__main__":
     main()
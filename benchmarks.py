@@ -0,0 +1,158 @@
+"""Offline benchmarks for the rolling, persistence and reporting hot paths."""
+
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from game_loader import load_game_module
+
+SEED = 1234
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+QUICK_SIZES = [10_000, 100_000]
+
+game_module = load_game_module()
+
+@contextlib.contextmanager
+def quiet():
+    original_input = builtins.input
+    builtins.input = lambda *args: ""
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        builtins.input = original_input
+
+def new_game(rolls=0, save_file=None):
+    game = game_module.PythonRNGGame(game_module.NullSink(), game_module.make_rng("counter", SEED), save_file)
+    if rolls:
+        game.roll_batch(rolls)
+    return game
+
+def measure(func, repeat=5, number=1, setup=None, items=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with quiet():
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            times.append((time.perf_counter() - start) / number)
+    result = {"min": min(times), "median": statistics.median(times), "repeat": repeat, "number": number}
+    if items:
+        result["items_per_sec"] = items / result["median"]
+    return result
+
+def remove_saves(save_file):
+    for path in Path(save_file).parent.glob(Path(save_file).stem + ".*"):
+        path.unlink()
+
+def bench_rolling(results, quick):
+    game = new_game()
+    results["roll_once"] = measure(game.roll_once, number=2_000 if quick else 20_000, items=1)
+    results["calculate_roll_outcome"] = measure(game.calculate_roll_outcome, number=20_000, items=1)
+
+    batch_rolls = 100_000 if quick else 1_000_000
+    results[f"roll_batch[{batch_rolls}]"] = measure(
+        lambda: game.roll_batch(batch_rolls), repeat=3, items=batch_rolls
+    )
+
+    game = new_game(10_000)
+    def check_goals():
+        game.check_quests()
+        game.check_achievements()
+    results["check_quests_achievements"] = measure(check_goals, number=100_000, items=1)
+
+def bench_history(results, size, workdir):
+    save_file = Path(workdir) / f"bench_{size}.sav"
+    game = new_game(size, save_file)
+    repeat = 3 if size <= 1_000_000 else 1
+
+    def force_snapshot():
+        game.save_journal.snapshot_stale = True
+    results[f"save_state_snapshot[{size}]"] = measure(game.save_state, repeat=repeat, setup=force_snapshot, items=size)
+    def add_rolls():
+        game.roll_batch(1_000)
+    results[f"save_state_journal[{size}]"] = measure(game.save_state, repeat=repeat, setup=add_rolls)
+
+    def load():
+        new_game(save_file=save_file).load_state()
+    results[f"load_state[{size}]"] = measure(load, repeat=repeat, items=size)
+
+    results[f"show_leaderboard[{size}]"] = measure(game.show_leaderboard, repeat=repeat, items=size)
+    results[f"view_roll_stats[{size}]"] = measure(game.view_roll_stats, repeat=repeat)
+    game.roll_log.close()
+    remove_saves(save_file)
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n{'benchmark':<40} {'median':>12} {'baseline':>12} {'change':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<40} {result['median']:>12.6f} {'-':>12} {'new':>9}")
+            continue
+        change = result["median"] / base["median"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<40} {result['median']:>12.6f} {base['median']:>12.6f} {change:>+8.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Python RNG hot paths with fixed seeds.")
+    parser.add_argument("--quick", action="store_true", help="small histories only")
+    parser.add_argument("--sizes", help="comma separated roll_log sizes for persistence/reporting benchmarks")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown ratio reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    if args.sizes:
+        sizes = [int(size) for size in args.sizes.split(",")]
+    else:
+        sizes = QUICK_SIZES if args.quick else DEFAULT_SIZES
+
+    results = {}
+    bench_rolling(results, args.quick)
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            bench_history(results, size, workdir)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": getattr(game_module.np, "__version__", None),
+            "seed": SEED,
+            "sizes": sizes
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+    else:
+        compare(results, {}, args.threshold)
+
+if __name__ == "__main__":
+    main()
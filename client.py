@@ -0,0 +1,101 @@
+"""Test client for server.py: one-off requests or a many-connection load test."""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+OPS = ["roll", "roll", "roll", "roll_n", "stats"]
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+
+    @classmethod
+    async def open(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        return cls(reader, writer)
+
+    async def request(self, op, **fields):
+        self.next_id += 1
+        self.writer.write(json.dumps({"id": self.next_id, "op": op, **fields}).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        if response["id"] != self.next_id:
+            raise RuntimeError(f"response {response['id']} for request {self.next_id}")
+        return response
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+async def run_player(host, port, index, args, latencies, errors):
+    connection = await Connection.open(host, port)
+    try:
+        if args.players:
+            response = await connection.request("login", player=f"{args.players}-{index}")
+            if not response["ok"]:
+                errors.append(response["error"])
+        for i in range(args.requests):
+            op = OPS[(index + i) % len(OPS)]
+            fields = {"amount": args.roll_n} if op == "roll_n" else {}
+            start = time.perf_counter()
+            response = await connection.request(op, **fields)
+            latencies.append(time.perf_counter() - start)
+            if not response["ok"]:
+                errors.append(response["error"])
+        if args.players:
+            await connection.request("save")
+    finally:
+        await connection.close()
+
+async def load_test(args):
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_player(args.host, args.port, index, args, latencies, errors) for index in range(args.connections)),
+        return_exceptions=True
+    )
+    duration = time.perf_counter() - start
+    failures = [result for result in results if isinstance(result, Exception)]
+
+    latencies.sort()
+    print(f"Connections: {args.connections} ({len(failures)} failed)")
+    print(f"Requests: {len(latencies):,} in {duration:.2f}s ({len(latencies) / duration:,.0f}/s)")
+    if latencies:
+        print(f"Latency p50: {statistics.median(latencies) * 1000:.2f}ms | "
+              f"p99: {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms | "
+              f"max: {latencies[-1] * 1000:.2f}ms")
+    if errors:
+        print(f"Errors: {len(errors)} (first: {errors[0]})")
+    if failures:
+        print(f"First connection failure: {failures[0]!r}")
+
+async def send(args):
+    connection = await Connection.open(args.host, args.port)
+    try:
+        for line in args.send:
+            request = json.loads(line)
+            print(json.dumps(await connection.request(request.pop("op"), **request), ensure_ascii=False))
+    finally:
+        await connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Talk to a Python RNG server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--send", nargs="+", metavar="JSON", help='requests to send in order, e.g. \'{"op": "roll"}\'')
+    parser.add_argument("--connections", type=int, default=100, help="concurrent players in the load test")
+    parser.add_argument("--requests", type=int, default=50, help="requests per player")
+    parser.add_argument("--roll-n", type=int, default=1000, help="amount for roll_n requests")
+    parser.add_argument("--players", help="log in as <PLAYERS>-<n> and save at the end")
+    args = parser.parse_args()
+
+    asyncio.run(send(args) if args.send else load_test(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""Loads "Python RNG.py" for the other scripts; its file name is not importable."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+GAME_PATH = Path(__file__).parent / "Python RNG.py"
+
+def load_game_module():
+    if "python_rng" in sys.modules:
+        return sys.modules["python_rng"]
+    spec = importlib.util.spec_from_file_location("python_rng", GAME_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # registered so process-pool workers can unpickle the game's functions
+    sys.modules["python_rng"] = module
+    spec.loader.exec_module(module)
+    return module
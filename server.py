@@ -0,0 +1,285 @@
+"""Asyncio TCP server hosting many game sessions over a JSON-lines protocol.
+
+Every request is one JSON object per line, e.g.
+
+    {"id": 1, "op": "login", "player": "aaranya"}
+    {"id": 2, "op": "roll_n", "amount": 100000}
+
+and gets one response line: {"id": 1, "ok": true, "result": ...} or
+{"id": 1, "ok": false, "error": "..."}.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from game_loader import load_game_module
+
+MAX_LINE_BYTES = 1 << 16
+MAX_PENDING_REQUESTS = 32
+MAX_ROLLS_PER_REQUEST = 1 << 30
+MAX_LOGGED_ROLLS = 1 << 20
+OFFLOAD_ROLLS = 10_000
+NOTABLE_LIMIT = 10
+
+game_module = load_game_module()
+
+class Session:
+    def __init__(self, game, player=None):
+        self.game = game
+        self.player = player
+        self.dirty = False
+        game.refresh_daily()
+
+class GameServer:
+    def __init__(self, save_dir, workers=None, max_pending=MAX_PENDING_REQUESTS,
+                 max_sessions=game_module.SESSION_CACHE_SIZE, max_bytes=game_module.SESSION_CACHE_BYTES, database=None, metrics_file=None):
+        save_dir = Path(save_dir)
+        save_dir.mkdir(parents=True, exist_ok=True)
+        # Players stay loaded after they disconnect until the store evicts
+        # them, so a quick reconnect skips the load.
+        # one Metrics shared by every session; counts are approximate under
+        # concurrent offloaded batches, which is fine for timings
+        self.metrics_file = metrics_file
+        self.metrics = game_module.Metrics(enabled=metrics_file is not None)
+        self.store = game_module.SessionStore(save_dir, max_sessions, max_bytes, database, self.metrics)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.max_pending = max_pending
+        self.connections = 0
+        self.players = set()
+        self.ops = {
+            "login": self.op_login,
+            "roll": self.op_roll,
+            "roll_n": self.op_roll_n,
+            "use_item": self.op_use_item,
+            "craft": self.op_craft,
+            "buy": self.op_buy,
+            "stats": self.op_stats,
+            "save": self.op_save,
+            "server_stats": self.op_server_stats,
+            "metrics": self.op_metrics
+        }
+
+    async def offload(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def call(self, session, func, *args, offload=False, mutates=True):
+        # Requests on a connection run one at a time, and a player can only
+        # be logged in on one connection, so a session never sees two ops at
+        # once. Each op gets a fresh summary sink so the quest/achievement/
+        # effect events it raised go back in the response.
+        summary = game_module.SummarySink()
+        session.game.events = summary
+        try:
+            if offload:
+                result = await self.offload(func, *args)
+            else:
+                result = func(*args)
+        finally:
+            session.game.events = game_module.NullSink()
+            session.dirty = session.dirty or mutates
+        return result, summary
+
+    def respond(self, result, summary):
+        events = [{"kind": kind, **data} for kind, data in summary.buffered]
+        if events:
+            result["events"] = events
+        return result
+
+    async def op_login(self, connection, request):
+        player = request.get("player", "")
+        if not re.fullmatch(r"[A-Za-z0-9_-]{1,32}", player):
+            raise ValueError("player must be 1-32 letters, digits, '_' or '-'")
+        if connection["session"].player is not None:
+            raise ValueError("already logged in")
+        if player in self.players:
+            raise ValueError(f"{player} is already connected")
+        self.players.add(player)
+        try:
+            game = await self.offload(self.store.acquire, player)
+        except Exception:
+            self.players.discard(player)
+            raise
+        session = Session(game, player)
+        connection["session"] = session
+        return {"player": player, "total_rolls": session.game.total_rolls}
+
+    async def op_roll(self, connection, request):
+        session = connection["session"]
+        code, summary = await self.call(session, session.game.roll_once)
+        game = session.game
+        return self.respond({
+            "roll_number": game.total_rolls,
+            "name": game.outcome_name(code),
+            "rarity": game.aura_rarities[code & ~game_module.SHINY_BIT],
+            "shiny": bool(code & game_module.SHINY_BIT)
+        }, summary)
+
+    async def op_roll_n(self, connection, request):
+        amount = int(request.get("amount", 0))
+        if not 0 < amount <= MAX_ROLLS_PER_REQUEST:
+            raise ValueError(f"amount must be between 1 and {MAX_ROLLS_PER_REQUEST}")
+        session = connection["session"]
+        # roll_batch logs every roll in the session's memory; past
+        # MAX_LOGGED_ROLLS only roll_aggregate's notable-only log is allowed
+        if amount <= MAX_LOGGED_ROLLS:
+            roll = session.game.roll_batch
+        elif game_module.np is not None:
+            roll = session.game.roll_aggregate
+        else:
+            raise ValueError(f"amount above {MAX_LOGGED_ROLLS} needs numpy on the server")
+        _, summary = await self.call(session, roll, amount, offload=amount >= OFFLOAD_ROLLS)
+        notable = summary.notable_rolls
+        return self.respond({
+            "total_rolls": session.game.total_rolls,
+            "notable_count": len(notable),
+            "notable": [
+                {"roll_number": roll_number, "name": name, "rarity": rarity, "shiny": shiny}
+                for roll_number, name, rarity, shiny in notable[-NOTABLE_LIMIT:]
+            ]
+        }, summary)
+
+    async def op_use_item(self, connection, request):
+        session = connection["session"]
+        copies = int(request.get("copies", 1))
+        effect, summary = await self.call(session, session.game.use_item, request.get("item"), copies)
+        return self.respond({"item": request.get("item"), "copies": copies, "effect": effect}, summary)
+
+    async def op_craft(self, connection, request):
+        # "times" is a count or "max" for as many as the materials allow
+        times = request.get("times", 1)
+        times = None if times == "max" else int(times)
+        session = connection["session"]
+        crafted, summary = await self.call(session, session.game.craft, request.get("recipe"), times)
+        return self.respond({"crafted": request.get("recipe"), "times": crafted}, summary)
+
+    async def op_buy(self, connection, request):
+        # one "item", or a list of "items" bought all together or not at all
+        items = request["items"] if "items" in request else [request.get("item")]
+        if not isinstance(items, list) or not items:
+            raise ValueError("items must be a non-empty list")
+        session = connection["session"]
+        _, summary = await self.call(session, session.game.buy_items, items)
+        return self.respond({"bought": items}, summary)
+
+    async def op_stats(self, connection, request):
+        session = connection["session"]
+        result, _ = await self.call(session, session.game.stats, mutates=False)
+        return result
+
+    async def op_save(self, connection, request):
+        session = connection["session"]
+        if session.player is None:
+            raise ValueError("log in before saving")
+        await self.offload(self.store.save, session.player)
+        session.dirty = False
+        return {"saved": session.player}
+
+    async def op_server_stats(self, connection, request):
+        return {"connections": self.connections, **self.store.stats()}
+
+    async def op_metrics(self, connection, request):
+        if not self.metrics.enabled:
+            raise ValueError("metrics are off; start the server with --metrics")
+        return self.metrics.to_json()
+
+    async def handle_request(self, connection, line):
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+        except (ValueError, AttributeError):
+            return {"id": None, "ok": False, "error": "malformed request"}
+        op = self.ops.get(request.get("op"))
+        if op is None:
+            return {"id": request_id, "ok": False, "error": f"unknown op: {request.get('op')}"}
+        try:
+            return {"id": request_id, "ok": True, "result": await op(connection, request)}
+        except Exception as e:
+            return {"id": request_id, "ok": False, "error": str(e)}
+
+    async def process(self, connection, queue, writer):
+        while True:
+            line = await queue.get()
+            if line is None:
+                return
+            # Shielded: cancelling this worker cannot stop a call already
+            # running in the thread pool, so the request is left to finish
+            # and handle_connection waits for it before releasing the session.
+            connection["request"] = asyncio.ensure_future(self.handle_request(connection, line))
+            response = await asyncio.shield(connection["request"])
+            writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            # a client that stops reading stalls here, which stops this
+            # connection's reads once its queue is full
+            await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        connection = {"session": Session(game_module.PythonRNGGame(game_module.NullSink())), "request": None}
+        # Bounded queue: once max_pending requests are waiting the reader
+        # stops pulling lines and TCP flow control pushes back on the client.
+        queue = asyncio.Queue(self.max_pending)
+        worker = asyncio.create_task(self.process(connection, queue, writer))
+        try:
+            while not worker.done():
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(b'{"id": null, "ok": false, "error": "request line too long"}\n')
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await queue.put(line)
+            if not worker.done():
+                await queue.put(None)
+            await worker
+        except (ConnectionError, asyncio.IncompleteReadError):
+            worker.cancel()
+        finally:
+            if connection["request"] is not None:
+                await asyncio.wait([connection["request"]])
+            session = connection["session"]
+            if session.player is not None:
+                await self.offload(self.store.release, session.player, session.dirty)
+                self.players.discard(session.player)
+            writer.close()
+            self.connections -= 1
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_BYTES)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"🎲 Serving Python RNG on {addresses}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.store.flush()
+            print(f"💾 Saved dirty sessions: {self.store.stats()}")
+            if self.metrics_file:
+                self.metrics.export(self.metrics_file)
+
+def main():
+    parser = argparse.ArgumentParser(description="Host Python RNG sessions over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--save-dir", default=str(Path(__file__).parent / "saves"), help="where player saves are kept")
+    parser.add_argument("--workers", type=int, help="threads for batch rolls and saves")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING_REQUESTS, help="queued requests per connection")
+    parser.add_argument("--max-sessions", type=int, default=game_module.SESSION_CACHE_SIZE, help="loaded players kept in memory")
+    parser.add_argument("--max-session-mb", type=int, default=game_module.SESSION_CACHE_BYTES >> 20, help="estimated memory budget for loaded players")
+    parser.add_argument("--database", help="keep every player in this SQLite database instead of per-player save files")
+    parser.add_argument("--metrics", metavar="FILE", help="time the hot paths and write the metrics here on shutdown (.json for JSON, else Prometheus text)")
+    args = parser.parse_args()
+
+    server = GameServer(args.save_dir, args.workers, args.max_pending, args.max_sessions, args.max_session_mb << 20,
+                        args.database, args.metrics)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n🛑 Server stopped.")
+
+if __name__ == "__main__":
+    main()
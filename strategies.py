@@ -0,0 +1,276 @@
+"""Monte Carlo strategy simulator: how many rolls does each policy need to reach a goal?
+
+Every simulated player is a fresh game with its own seed that follows one
+policy for shop purchases, crafting and item use, under the same rules as
+the menus (item_usage_effects, crafted_recipes, get_luck_multiplier). Time
+is simulated: each roll advances a clock by 1 / --rolls-per-second, which
+drives effect expiries and daily shop/quest resets. Players run in
+parallel across processes, and player i gets the same seed under every
+policy, so policies are compared on common random numbers.
+
+    python strategies.py --goal Diamond --players 200
+    python strategies.py --goal Celestial --policies hoard,craft_first --max-rolls 50000000
+"""
+
+import argparse
+import json
+import math
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from game_loader import load_game_module
+
+START_TIME = datetime(2025, 1, 1).timestamp()
+DECISION_ROLLS = 10_000
+Z_95 = 1.96
+
+game_module = load_game_module()
+
+class SimulatedClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class Policy:
+    # Does nothing. Subclass it and add the class to POLICIES; each hook gets
+    # the game between roll steps, and actions it rejects are skipped.
+    def buy_items(self, game):
+        # lists of shop items, each list bought all together or not at all
+        return []
+
+    def craft_items(self, game):
+        # (recipe, times) pairs; times=None crafts as many as possible
+        return []
+
+    def use_items(self, game):
+        # (item, copies) pairs
+        return []
+
+    def act(self, game):
+        counts = {"bought": 0, "crafted": 0, "used": 0}
+        for order in self.buy_items(game):
+            try:
+                game.buy_items(order)
+                counts["bought"] += len(order)
+            except ValueError:
+                pass
+        for recipe, times in self.craft_items(game):
+            try:
+                counts["crafted"] += game.craft(recipe, times)
+            except ValueError:
+                pass
+        for item, copies in self.use_items(game):
+            try:
+                game.use_item(item, copies)
+                counts["used"] += copies
+            except ValueError:
+                pass
+        return counts
+
+class UseAsEarned(Policy):
+    """Buys one of each affordable shop item a day and uses an item as soon
+    as its effect is not already running."""
+
+    def __init__(self):
+        self.shopped_day = None
+
+    def buy_items(self, game):
+        if self.shopped_day == game.today_date:
+            return []
+        self.shopped_day = game.today_date
+        return [[item] for stock in game.daily_shop.values() for item, required_aura in stock
+                if required_aura is None or game.aura_counts[required_aura] > 0]
+
+    def use_items(self, game):
+        actions = []
+        active = set(game.active_effect_types)
+        for item, _ in list(game.item_inventory.items()):
+            effect = game.effect_for(item)
+            if effect and effect[0] not in active:
+                actions.append((item, 1))
+                active.add(effect[0])
+        return actions
+
+class StackCopies(UseAsEarned):
+    """Like UseAsEarned, but uses every copy of an item at once so the
+    durations stack into one long effect."""
+
+    def use_items(self, game):
+        return [(item, game.item_inventory.count(item)) for item, _ in super().use_items(game)]
+
+class CraftFirst(UseAsEarned):
+    """Crafts every recipe the materials allow before using anything, so
+    recipe parts go into crafted items instead of being used on their own."""
+
+    def craft_items(self, game):
+        return [(recipe, None) for recipe in game.crafted_recipes if game.max_crafts(recipe)]
+
+POLICIES = {
+    "hoard": Policy,
+    "use_as_earned": UseAsEarned,
+    "stack_copies": StackCopies,
+    "craft_first": CraftFirst
+}
+
+def goal_codes(game, goal):
+    # "Shiny X" only counts the shiny one; a plain aura name counts both
+    if goal.startswith("Shiny "):
+        return [game.aura_index[goal[len("Shiny "):]] | game_module.SHINY_BIT]
+    code = game.aura_index[goal]
+    return [code, code | game_module.SHINY_BIT]
+
+def next_midnight(now):
+    return datetime.combine(datetime.fromtimestamp(now).date() + timedelta(days=1), datetime.min.time()).timestamp()
+
+def simulate_player(policy_name, seed, goal, max_rolls, rolls_per_second):
+    game = game_module.PythonRNGGame(game_module.NullSink(), game_module.make_rng("counter", seed))
+    clock = game.clock = SimulatedClock(START_TIME)
+    policy = POLICIES[policy_name]()
+    codes = goal_codes(game, goal)
+    actions = {"bought": 0, "crafted": 0, "used": 0}
+
+    while game.total_rolls < max_rolls:
+        game.refresh_daily()
+        game.apply_item_effects()
+        for kind, count in policy.act(game).items():
+            actions[kind] += count
+
+        # Roll up to the next point where the rules change: an effect
+        # expiring, a new day, or the next policy decision.
+        step = min(
+            DECISION_ROLLS,
+            max_rolls - game.total_rolls,
+            (game.next_effect_expiry - clock.now) * rolls_per_second,
+            (next_midnight(clock.now) - clock.now) * rolls_per_second
+        )
+        step = max(1, math.ceil(step))
+        # a fresh log per step keeps memory flat; only the first hit matters
+        game.roll_log = game_module.RollLog(game.aura_names)
+        game.visit_log = game_module.VisitLog(game.content.biome_names)
+        game.roll_batch(step)
+        clock.now += step / rolls_per_second
+
+        hits = [game.roll_log.first_rolls[code] for code in codes if game.roll_log.code_counts[code]]
+        if hits:
+            return {"rolls": min(hits), **actions}
+    return {"rolls": None, **actions}
+
+def run_player(job):
+    return simulate_player(*job)
+
+def order_statistic(ordered, rank):
+    value = ordered[min(max(rank, 0), len(ordered) - 1)]
+    return None if value == math.inf else value
+
+def summarize(results):
+    # Players that never reached the goal count as infinitely slow, so
+    # quantiles stay honest; the mean is only given when every player got
+    # there.
+    rolls = [result["rolls"] for result in results]
+    n = len(rolls)
+    reached = sorted(r for r in rolls if r is not None)
+    ordered = reached + [math.inf] * (n - len(reached))
+    # distribution-free 95% interval for the median from binomial ranks
+    spread = Z_95 * math.sqrt(n) / 2
+    summary = {
+        "players": n,
+        "reached": len(reached),
+        "median": order_statistic(ordered, (n - 1) // 2),
+        "median_ci": (order_statistic(ordered, math.floor(n / 2 - spread) - 1), order_statistic(ordered, math.ceil(n / 2 + spread) - 1)),
+        "p10": order_statistic(ordered, int(0.1 * (n - 1))),
+        "p90": order_statistic(ordered, int(0.9 * (n - 1))),
+        "mean": None,
+        "mean_ci": None,
+        "actions": {kind: statistics.mean(result[kind] for result in results) for kind in ("bought", "crafted", "used")}
+    }
+    if len(reached) == n and n > 1:
+        mean = statistics.mean(reached)
+        margin = Z_95 * statistics.stdev(reached) / math.sqrt(n)
+        summary["mean"] = mean
+        summary["mean_ci"] = (mean - margin, mean + margin)
+    return summary
+
+def paired_difference(results, baseline):
+    # player i has the same seed under both policies
+    diffs = [a["rolls"] - b["rolls"] for a, b in zip(results, baseline) if a["rolls"] is not None and b["rolls"] is not None]
+    if len(diffs) < 2:
+        return None
+    mean = statistics.mean(diffs)
+    margin = Z_95 * statistics.stdev(diffs) / math.sqrt(len(diffs))
+    return {"pairs": len(diffs), "mean": mean, "ci": (mean - margin, mean + margin)}
+
+def format_rolls(value):
+    return "never" if value is None else f"{value:,.0f}"
+
+def report(summaries, differences, goal, rolls_per_second):
+    print(f"\n🎯 Rolls to obtain {goal} (95% confidence intervals)")
+    print(f"{'policy':<16} {'reached':>9} {'median':>12} {'median CI':>25} {'mean':>12} {'mean CI':>25} {'p10':>11} {'p90':>11}")
+    for name, summary in summaries.items():
+        median_ci = " - ".join(map(format_rolls, summary["median_ci"]))
+        mean_ci = " - ".join(map(format_rolls, summary["mean_ci"])) if summary["mean_ci"] else "-"
+        print(f"{name:<16} {summary['reached']:>4}/{summary['players']:<4} {format_rolls(summary['median']):>12} {median_ci:>25} "
+              f"{format_rolls(summary['mean']) if summary['mean'] is not None else '-':>12} {mean_ci:>25} {format_rolls(summary['p10']):>11} {format_rolls(summary['p90']):>11}")
+
+    print("\n🎒 Average actions per player")
+    for name, summary in summaries.items():
+        actions = summary["actions"]
+        print(f"{name:<16} bought {actions['bought']:,.1f} | crafted {actions['crafted']:,.1f} | used {actions['used']:,.1f}")
+
+    baseline = next(iter(summaries))
+    if differences:
+        print(f"\n⚖️ Paired difference vs {baseline} (negative is faster)")
+        for name, difference in differences.items():
+            if difference is None:
+                print(f"{name:<16} not enough players reached the goal under both")
+            else:
+                print(f"{name:<16} {difference['mean']:>+14,.0f} rolls  (95% CI {difference['ci'][0]:+,.0f} to {difference['ci'][1]:+,.0f}, {difference['pairs']} pairs)")
+    if summaries[baseline]["median"] is not None:
+        median_hours = summaries[baseline]["median"] / rolls_per_second / 3600
+        print(f"\n⏱️ At {rolls_per_second:g} rolls/s the {baseline} median is {median_hours:,.1f} hours of play.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare item, crafting and shop strategies by simulated rolls to a goal.")
+    parser.add_argument("--goal", default="Diamond", help="aura to obtain; 'Shiny <aura>' counts only the shiny one")
+    parser.add_argument("--policies", default=",".join(POLICIES), help=f"comma separated, first is the baseline ({', '.join(POLICIES)})")
+    parser.add_argument("--players", type=int, default=100, help="simulated players per policy")
+    parser.add_argument("--max-rolls", type=int, default=10_000_000, help="give up on a player after this many rolls")
+    parser.add_argument("--rolls-per-second", type=float, default=1.0, help="how fast simulated time passes per roll")
+    parser.add_argument("--workers", type=int, help="processes to use (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="players use seeds seed, seed+1, ...")
+    parser.add_argument("--output", help="write per-player results and summaries as JSON")
+    args = parser.parse_args()
+
+    policies = [name.strip() for name in args.policies.split(",") if name.strip()]
+    unknown = [name for name in policies if name not in POLICIES]
+    if unknown:
+        parser.error(f"unknown policies: {', '.join(unknown)}")
+    try:
+        goal_codes(game_module.PythonRNGGame(game_module.NullSink()), args.goal)
+    except KeyError:
+        parser.error(f"unknown aura: {args.goal}")
+
+    jobs = [(name, args.seed + i, args.goal, args.max_rolls, args.rolls_per_second) for name in policies for i in range(args.players)]
+    print(f"🎲 Simulating {args.players} players x {len(policies)} policies to {args.goal}...")
+    start = time.perf_counter()
+    results = {name: [] for name in policies}
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for done, (job, result) in enumerate(zip(jobs, executor.map(run_player, jobs)), 1):
+            results[job[0]].append(result)
+            if done % max(1, len(jobs) // 10) == 0 or done == len(jobs):
+                print(f"Progress: {done}/{len(jobs)} players ({time.perf_counter() - start:.1f}s)")
+
+    summaries = {name: summarize(results[name]) for name in policies}
+    differences = {name: paired_difference(results[name], results[policies[0]]) for name in policies[1:]}
+    report(summaries, differences, args.goal, args.rolls_per_second)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "summaries": summaries, "differences": differences, "results": results}, f, indent=4)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Aggregate rolls sample the same outcome distribution as single rolls."""
+
+import math
+
+import numpy as np
+
+from game_loader import load_game_module
+
+game_module = load_game_module()
+
+def new_game(save_file=None, seed=1):
+    return game_module.PythonRNGGame(game_module.NullSink(), game_module.make_rng("counter", seed), save_file)
+
+def one_segment(game):
+    biome = game.content.biome_index[game.current_biome]
+    weather = game.content.weather_index[game.current_weather]
+    def sample_segments(generator, start_biome, start_weather, amount):
+        return np.array([0]), np.array([amount]), np.array([biome]), np.array([weather])
+    return sample_segments
+
+def test_aggregate_counts_follow_outcome_odds():
+    game = new_game()
+    game.sample_segments = one_segment(game)
+    odds = game.outcome_odds()
+    amount = 1 << 22
+
+    notable = game.roll_aggregate(amount)
+
+    counts = {**game.aura_counts, **game.shiny_aura_counts}
+    assert sum(counts.values()) == amount
+    for code, chance in odds.items():
+        expected = amount * chance
+        if expected >= 100:
+            assert abs(counts[game.roll_log.name_of(code)] - expected) < 6 * math.sqrt(expected)
+    roll_numbers = [roll_number for roll_number, _ in notable]
+    assert len(set(roll_numbers)) == len(roll_numbers)
+    assert all(1 <= roll_number <= amount for roll_number in roll_numbers)
+    assert sorted(roll_numbers) == [roll_number for roll_number, _ in game.roll_log]
+
+def test_aggregate_rechecks_effects_each_window(monkeypatch):
+    monkeypatch.setattr(game_module, "AGGREGATE_WINDOW", 1 << 12)
+    now = [1_000_000.0]
+    game = new_game()
+    game.clock = lambda: now[0]
+    game.start_effect("Lucky Charm", 60)
+    boosted = game.get_luck_multiplier()
+    assert boosted > 1.0
+
+    seen = []
+    outcome_odds = game.outcome_odds
+    def recording_odds(biome, weather, luck_multiplier, shiny_chance):
+        seen.append(luck_multiplier)
+        return outcome_odds(biome, weather, luck_multiplier, shiny_chance)
+    game.outcome_odds = recording_odds
+
+    def progress(done, amount):
+        now[0] += 100
+    game.roll_aggregate(4 << 12, progress)
+
+    assert game.luck_multiplier == 1.0
+    assert "Lucky Charm" not in game.item_effects
+    assert boosted in seen and 1.0 in seen
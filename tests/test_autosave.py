@@ -0,0 +1,51 @@
+"""Background saves catch up while the game waits on the player."""
+
+import time
+
+from game_loader import load_game_module
+
+game_module = load_game_module()
+
+def new_game(save_file=None, seed=1):
+    return game_module.PythonRNGGame(game_module.NullSink(), game_module.make_rng("counter", seed), save_file)
+
+def wait_for(check, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not check() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return check()
+
+def test_idle_prompt_saves_after_interval(tmp_path):
+    save_file = tmp_path / "player.sav"
+    game = new_game(save_file)
+    autosave = game.autosave = game_module.Autosaver(game, interval=0.2)
+    try:
+        game.roll_batch(1_000)
+        game.mark_dirty()
+        assert autosave.saves == 0
+        time.sleep(0.3)
+        # busy, not at a prompt: nothing is captured behind the game's back
+        assert autosave.saves == 0
+
+        with autosave.idle():
+            assert wait_for(lambda: autosave.saves == 1)
+        assert not autosave.dirty
+        assert save_file.exists()
+    finally:
+        autosave.close()
+        game.roll_log.close()
+
+    loaded = new_game(save_file, seed=2)
+    loaded.read_save()
+    assert loaded.total_rolls == 1_000
+    loaded.roll_log.close()
+
+def test_idle_prompt_without_changes_does_not_save(tmp_path):
+    game = new_game(tmp_path / "player.sav")
+    autosave = game.autosave = game_module.Autosaver(game, interval=0.05)
+    try:
+        with autosave.idle():
+            time.sleep(0.2)
+        assert autosave.saves == 0
+    finally:
+        autosave.close()
@@ -0,0 +1,71 @@
+"""Indexed quest and achievement checks unlock the same goals as scanning every one."""
+
+import random
+from types import SimpleNamespace
+
+from game_loader import load_game_module
+
+game_module = load_game_module()
+
+class RecordingSink(game_module.EventSink):
+    def __init__(self):
+        self.unlocked = []
+
+    def emit(self, kind, **data):
+        if kind == "quest_completed":
+            self.unlocked.append(data["quest"])
+        elif kind == "achievement_unlocked":
+            self.unlocked.append(data["title"])
+
+def scanned(game, done):
+    # the checks from before the index: every goal, in definition order
+    reached = []
+    for goals in (game.all_quests, game.achievement_milestones):
+        for name, (_, (metric, threshold), *_) in goals.items():
+            if name not in done and getattr(game, metric) >= threshold:
+                reached.append(name)
+    return reached
+
+def test_goal_index_matches_linear_scan():
+    sink = RecordingSink()
+    game = game_module.PythonRNGGame(sink, game_module.make_rng("counter", 3))
+    # a fixed day, so quests are not reset part way
+    game.clock = lambda: 1_800_000_000.0
+    done = set()
+    for _ in range(10_050):
+        before = len(sink.unlocked)
+        game.roll_once()
+        expected = scanned(game, done)
+        assert sink.unlocked[before:] == expected
+        done.update(expected)
+    assert len(done) > len(game.all_quests)
+
+def test_rearmed_index_skips_finished_goals():
+    sink = RecordingSink()
+    game = game_module.PythonRNGGame(sink, game_module.make_rng("counter", 3))
+    # a fixed day, so quests are not reset part way
+    game.clock = lambda: 1_800_000_000.0
+    game.roll_batch(2_000)
+    unlocked = list(sink.unlocked)
+    assert unlocked
+
+    game.recompute_aggregates()
+    game.check_quests()
+    game.check_achievements()
+    assert sink.unlocked == unlocked
+
+def test_goal_index_orders_goals_crossed_together():
+    rng = random.Random(5)
+    metrics = ["total_rolls", "unique_auras", "max_rarity"]
+    goals = {f"goal {i}": ("", (rng.choice(metrics), rng.randint(1, 1_000)), None) for i in range(200)}
+    index = game_module.GoalIndex(goals)
+    index.arm(goals)
+
+    state = SimpleNamespace(**dict.fromkeys(metrics, 0))
+    done = set()
+    while len(done) < len(goals):
+        for metric in metrics:
+            setattr(state, metric, getattr(state, metric) + rng.randint(0, 150))
+        expected = [name for name, (_, (metric, threshold), _) in goals.items() if name not in done and getattr(state, metric) >= threshold]
+        assert index.crossed(state) == expected
+        done.update(expected)
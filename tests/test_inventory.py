@@ -0,0 +1,69 @@
+"""Items are kept as counts, in memory and in every save format."""
+
+import pytest
+
+from game_loader import load_game_module
+
+game_module = load_game_module()
+
+def new_game(save_file=None, seed=1, database=None):
+    return game_module.PythonRNGGame(game_module.NullSink(), game_module.make_rng("counter", seed), save_file, database)
+
+def test_inventory_counts_copies():
+    inventory = game_module.Inventory(["Mystic Scroll", "Lucky Charm", "Mystic Scroll"])
+    assert inventory.to_dict() == {"Mystic Scroll": 2, "Lucky Charm": 1}
+    assert len(inventory) == 3
+    assert list(inventory) == ["Mystic Scroll", "Mystic Scroll", "Lucky Charm"]
+
+    inventory.add("Lucky Charm", 1_000_000)
+    inventory.remove("Mystic Scroll", 2)
+    assert "Mystic Scroll" not in inventory
+    assert list(inventory.items()) == [("Lucky Charm", 1_000_001)]
+    with pytest.raises(ValueError):
+        inventory.remove("Lucky Charm", 1_000_002)
+    assert len(inventory) == 1_000_001
+
+def test_snapshot_and_journal_keep_counts(tmp_path):
+    save_file = tmp_path / "player.sav"
+    game = new_game(save_file)
+    game.item_inventory.add("Lucky Charm", 1_000_000)
+    game.write_save()
+    game.item_inventory.remove("Lucky Charm", 10)
+    game.item_inventory.add("Mystic Scroll", 3)
+    game.write_save()
+
+    loaded = new_game(save_file, seed=2)
+    loaded.read_save()
+    assert loaded.item_inventory.to_dict() == {"Lucky Charm": 999_990, "Mystic Scroll": 3}
+    assert len(loaded.item_inventory) == 999_993
+    game.roll_log.close()
+    loaded.roll_log.close()
+
+def test_headers_with_an_item_list_still_load():
+    game = new_game()
+    game.item_inventory.add("Lucky Charm", 2)
+    header = game.snapshot_header()
+    del header["item_counts"]
+    header["item_inventory"] = ["Lucky Charm", "Mystic Scroll", "Lucky Charm"]
+
+    loaded = new_game()
+    loaded.apply_header(header)
+    assert loaded.item_inventory.to_dict() == {"Lucky Charm": 2, "Mystic Scroll": 1}
+
+def test_sqlite_saves_only_changed_items(tmp_path):
+    path = tmp_path / "saves.db"
+    game = new_game(database=game_module.SQLiteSaves(path, "ada"))
+    game.item_inventory.add("Lucky Charm", 5)
+    game.item_inventory.add("Mystic Scroll")
+    game.write_save()
+    game.item_inventory.remove("Mystic Scroll")
+    game.item_inventory.add("Lucky Charm", 1_000)
+    game.write_save()
+
+    loaded = new_game(database=game_module.SQLiteSaves(path, "ada"))
+    loaded.read_save()
+    assert loaded.item_inventory.to_dict() == {"Lucky Charm": 1_005}
+    rows = loaded.database.db.execute("SELECT item, quantity FROM inventory WHERE player = 'ada'").fetchall()
+    assert rows == [("Lucky Charm", 1_005)]
+    game.database.close()
+    loaded.database.close()
@@ -0,0 +1,67 @@
+"""Exact outcome odds against the rejection loop roll_once used to run."""
+
+import math
+from collections import Counter
+from itertools import permutations
+
+import pytest
+
+from game_loader import load_game_module
+
+game_module = load_game_module()
+SHINY_BIT = game_module.SHINY_BIT
+
+def new_game(save_file=None, seed=1):
+    return game_module.PythonRNGGame(game_module.NullSink(), game_module.make_rng("counter", seed), save_file)
+
+def loop_odds(game, roll_pool, shiny_chance):
+    # The rejection loop roll_once used to run, enumerated over every order
+    # random.choice could try the entries in: a failed entry is dropped until
+    # one is left, that one gets the rest of the 10n attempts, then Amber.
+    size = len(roll_pool)
+    odds = Counter()
+    for order in permutations(roll_pool):
+        reach = 1 / math.factorial(size)
+        for name, rarity in order[:-1]:
+            odds[name] += reach / rarity
+            reach *= 1 - 1 / rarity
+        name, rarity = order[-1]
+        miss = (1 - 1 / rarity) ** (9 * size + 1)
+        odds[name] += reach * (1 - miss)
+        odds[None] += reach * miss
+
+    codes = Counter()
+    for name, chance in odds.items():
+        if name is None:
+            codes[game.aura_index["Amber"]] += chance
+        else:
+            codes[game.aura_index[name]] += chance * (1 - 1 / shiny_chance)
+            codes[game.aura_index[name] | SHINY_BIT] += chance / shiny_chance
+    return codes
+
+@pytest.mark.parametrize("biome, weather, luck, shiny_chance", [
+    ("Void Realm", "Clear", 1.0, 250),
+    ("Plains", "Rain", 1.0, 250),
+    ("Crystal Caves", "Storm", 10.0, 100),
+    ("Volcano", "Aurora", 50.0, 10),
+])
+def test_outcome_odds_match_rejection_loop(biome, weather, luck, shiny_chance):
+    game = new_game()
+    odds = game.outcome_odds(biome, weather, luck, shiny_chance)
+    expected = loop_odds(game, game.calculate_roll_outcome(biome, weather, luck), shiny_chance)
+
+    assert set(code for code, chance in odds.items() if chance) == set(code for code, chance in expected.items() if chance)
+    for code, chance in expected.items():
+        assert odds[code] == pytest.approx(chance, rel=1e-9, abs=1e-15)
+    assert sum(odds.values()) == pytest.approx(1.0, rel=1e-12)
+
+def test_single_entry_pool_gets_ten_attempts():
+    game = new_game()
+    odds = Counter()
+    for code, chance in game.compute_outcome_distribution([("Diamond", 40)], 250):
+        odds[code] += chance
+    hit = 1 - (1 - 1 / 40) ** 10
+    code = game.aura_index["Diamond"]
+    assert odds[code] == pytest.approx(hit * 249 / 250, rel=1e-12)
+    assert odds[code | SHINY_BIT] == pytest.approx(hit / 250, rel=1e-12)
+    assert odds[game.aura_index["Amber"]] == pytest.approx(1 - hit, rel=1e-12)
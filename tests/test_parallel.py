@@ -0,0 +1,43 @@
+"""Sharded rolls stay reproducible from the game's seed."""
+
+import builtins
+
+from game_loader import load_game_module
+
+game_module = load_game_module()
+
+def new_game(save_file=None, seed=1):
+    return game_module.PythonRNGGame(game_module.NullSink(), game_module.make_rng("counter", seed), save_file)
+
+def rolled(monkeypatch, seed, amount):
+    game = new_game(seed=seed)
+    answers = iter([str(amount)])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(answers, ""))
+    game.roll_multiple()
+    return dict(game.aura_counts), game.total_rolls
+
+def test_roll_multiple_parallel_follows_game_seed(monkeypatch):
+    monkeypatch.setattr(game_module, "PARALLEL_THRESHOLD", 1 << 12)
+    monkeypatch.setattr(game_module, "PARALLEL_SHARD_SIZE", 1 << 11)
+    monkeypatch.setattr(game_module.os, "cpu_count", lambda: 2)
+
+    first = rolled(monkeypatch, 7, 10_000)
+    assert first[1] == 10_000
+    assert rolled(monkeypatch, 7, 10_000) == first
+    assert rolled(monkeypatch, 8, 10_000) != first
+
+def parallel_state(workers):
+    game = new_game()
+    game.roll_parallel(20_000, workers=workers, seed=11)
+    return (
+        game.total_rolls, dict(game.aura_counts), dict(game.shiny_aura_counts), list(game.roll_log),
+        # visits are stamped with the wall clock, so only their biomes repeat
+        [biome for _, biome in game.visit_log], game.current_biome, game.current_weather
+    )
+
+def test_parallel_results_ignore_worker_count(monkeypatch):
+    monkeypatch.setattr(game_module, "PARALLEL_SHARD_SIZE", 1 << 11)
+    single = parallel_state(1)
+    assert single[0] == 20_000
+    assert parallel_state(2) == single
+    assert parallel_state(3) == single
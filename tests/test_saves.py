@@ -0,0 +1,171 @@
+"""Round-trips saves through the binary snapshot and the journal."""
+
+import json
+
+from game_loader import load_game_module
+
+game_module = load_game_module()
+
+def new_game(save_file=None, seed=1):
+    return game_module.PythonRNGGame(game_module.NullSink(), game_module.make_rng("counter", seed), save_file)
+
+def state_of(game):
+    header = game.snapshot_header()
+    header["visited_biomes"] = sorted(header["visited_biomes"])
+    return header, list(game.roll_log), [tuple(entry) for entry in game.visit_log]
+
+def reload(save_file):
+    game = new_game(save_file, seed=2)
+    game.read_save()
+    return game
+
+def close(*games):
+    for game in games:
+        game.roll_log.close()
+
+def played(save_file):
+    game = new_game(save_file)
+    game.roll_batch(20_000)
+    game.item_inventory.add("Lucky Charm", 2)
+    game.start_effect("Lucky Charm", 3600)
+    return game
+
+def test_snapshot_round_trip(tmp_path):
+    save_file = tmp_path / "player.sav"
+    game = played(save_file)
+    game.write_save()
+
+    assert save_file.read_bytes().startswith(game_module.SAVE_MAGIC)
+    assert game.save_journal.journal_file.read_bytes() == b""
+    loaded = reload(save_file)
+    assert state_of(loaded) == state_of(game)
+    close(game, loaded)
+
+def test_journal_records_replay_over_snapshot(tmp_path):
+    save_file = tmp_path / "player.sav"
+    game = played(save_file)
+    game.write_save()
+    game.roll_batch(5_000)
+    game.item_inventory.add("Mystic Scroll")
+    game.write_save()
+
+    assert len(game.save_journal.journal_file.read_bytes().splitlines()) == 1
+    loaded = reload(save_file)
+    assert state_of(loaded) == state_of(game)
+    assert all(type(entry) is tuple for entry in loaded.visit_log)
+    close(game, loaded)
+
+def test_torn_journal_tail_is_dropped(tmp_path):
+    save_file = tmp_path / "player.sav"
+    game = played(save_file)
+    game.write_save()
+    game.roll_batch(5_000)
+    game.write_save()
+    expected = state_of(game)
+    good_bytes = game.save_journal.journal_file.stat().st_size
+
+    game.roll_batch(5_000)
+    game.write_save()
+    journal = game.save_journal.journal_file
+    journal.write_bytes(journal.read_bytes()[:good_bytes + 40])
+
+    loaded = reload(save_file)
+    assert state_of(loaded) == expected
+    assert journal.stat().st_size == good_bytes
+
+    # the next record starts on a clean line
+    loaded.roll_batch(1_000)
+    loaded.write_save()
+    reloaded = reload(save_file)
+    assert state_of(reloaded) == state_of(loaded)
+    close(game, loaded, reloaded)
+
+def test_records_older_than_snapshot_are_skipped(tmp_path):
+    # a crash between the snapshot's rename and the journal truncate
+    save_file = tmp_path / "player.sav"
+    game = played(save_file)
+    game.write_save()
+    game.roll_batch(5_000)
+    game.write_save()
+    journal = game.save_journal.journal_file
+    old_records = journal.read_bytes()
+
+    game.roll_batch(5_000)
+    game.save_journal.snapshot_stale = True
+    game.write_save()
+    journal.write_bytes(old_records)
+
+    loaded = reload(save_file)
+    assert state_of(loaded) == state_of(game)
+    close(game, loaded)
+
+def test_visit_log_loads_lazily(tmp_path):
+    save_file = tmp_path / "player.sav"
+    game = played(save_file)
+    game.write_save()
+    game.roll_batch(2_000)
+    game.write_save()
+
+    loaded = reload(save_file)
+    visits = loaded.visit_log
+    # the snapshot's visits stay on disk until something reads them
+    assert visits.loader is not None
+    assert len(visits) == len(game.visit_log)
+    assert visits.pending < len(visits)
+    assert visits[visits.pending:] == [tuple(entry) for entry in game.visit_log[visits.pending:]]
+    assert visits.loader is not None
+
+    assert list(visits) == list(game.visit_log)
+    assert visits.loader is None
+    close(game, loaded)
+
+def test_visit_log_encoding_round_trips():
+    game = new_game()
+    game.roll_batch(2_000)
+    visits = game.visit_log
+    assert visits.decode(visits.encode()) == list(visits)
+
+def test_visit_encoder_keeps_what_it_captured(tmp_path):
+    save_file = tmp_path / "player.sav"
+    game = played(save_file)
+    game.write_save()
+
+    loaded = reload(save_file)
+    visits = loaded.visit_log
+    encode = visits.encoder()
+    expected = list(game.visit_log)
+    assert expected
+    # the save thread packs later, after the game has loaded and moved on
+    visits.load()
+    visits.append(("2026-01-01T00:00:00", visits.biome_names[0]))
+    assert visits.decode(encode()) == expected
+    close(game, loaded)
+
+def test_legacy_json_save_converts(tmp_path):
+    game = new_game()
+    game.roll_batch(3_000)
+    game.item_inventory.add("Mystic Scroll")
+    game.start_effect("Lucky Charm", 3600)
+    legacy = {
+        "aura_counts": dict(game.aura_counts),
+        "shiny_aura_counts": dict(game.shiny_aura_counts),
+        "total_rolls": game.total_rolls,
+        "roll_log": [list(entry) for entry in game.roll_log],
+        "visited_biomes": list(game.visited_biomes),
+        "item_inventory": [item for item, count in game.item_inventory.items() for _ in range(count)],
+        "item_effects": dict(game.item_effects),
+        "quest_status": dict(game.quest_status),
+        "titles_earned": list(game.titles_earned),
+        "current_biome": game.current_biome,
+        "current_weather": game.current_weather,
+        "today_date": game.today_date,
+        "visit_log": [list(entry) for entry in game.visit_log]
+    }
+    json_file = tmp_path / "player.json"
+    json_file.write_text(json.dumps(legacy, indent=4, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+
+    save_file = game_module.convert_save(json_file)
+    loaded = reload(save_file)
+    assert save_file.read_bytes().startswith(game_module.SAVE_MAGIC)
+    assert state_of(loaded) == state_of(game)
+    close(loaded)
@@ -0,0 +1,65 @@
+"""The server's session cache evicts least recently used players and saves them first."""
+
+from game_loader import load_game_module
+
+game_module = load_game_module()
+
+def play(store, player, rolls):
+    game = store.acquire(player)
+    game.roll_batch(rolls)
+    store.release(player, dirty=True)
+    return game
+
+def close(store):
+    for game in store.sessions.values():
+        if isinstance(game.roll_log, game_module.MappedRollLog):
+            game.roll_log.close()
+        if game.database is not None:
+            game.database.close()
+
+def test_evicts_least_recently_used_and_writes_back(tmp_path):
+    store = game_module.SessionStore(tmp_path, max_sessions=2)
+    play(store, "ada", 100)
+    play(store, "bob", 200)
+    store.acquire("ada")
+    store.release("ada")
+    play(store, "cy", 300)
+
+    assert list(store.sessions) == ["ada", "cy"]
+    assert store.stats()["evictions"] == 1
+    assert store.stats()["writebacks"] == 1
+    assert store.save_path("bob").exists()
+    assert not store.save_path("cy").exists()
+
+    bob = store.acquire("bob")
+    assert bob.total_rolls == 200
+    store.release("bob")
+    assert store.stats()["misses"] == 4
+    close(store)
+
+def test_pinned_sessions_stay_cached(tmp_path):
+    store = game_module.SessionStore(tmp_path, max_sessions=1)
+    held = store.acquire("ada")
+    play(store, "bob", 100)
+    assert "ada" in store.sessions
+    assert store.acquire("ada") is held
+    store.release("ada")
+    store.release("ada")
+    close(store)
+
+def test_database_sessions_share_one_connection(tmp_path):
+    database = tmp_path / "saves.db"
+    store = game_module.SessionStore(tmp_path, max_sessions=2, database=database)
+    ada = play(store, "ada", 100)
+    bob = play(store, "bob", 200)
+    assert ada.database.connection is bob.database.connection
+    assert ada.database.connection.users == 2
+
+    play(store, "cy", 300)
+    # ada was evicted and gave its share back
+    assert ada.database.connection is None
+    assert bob.database.connection.users == 2
+    store.flush()
+    assert dict(bob.database.top_players()) == {"ada": 100, "bob": 200, "cy": 300}
+    close(store)
+    assert not game_module.SharedConnection.open_connections
@@ -0,0 +1,80 @@
+"""SQLite saves recover from saves that failed or crashed part way."""
+
+import sqlite3
+
+import pytest
+
+from game_loader import load_game_module
+
+game_module = load_game_module()
+
+def new_game(database, seed=1):
+    return game_module.PythonRNGGame(game_module.NullSink(), game_module.make_rng("counter", seed), database=database)
+
+def stored_rolls(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*), MAX(roll_number) FROM rolls").fetchone()
+
+def reload(path):
+    game = new_game(game_module.SQLiteSaves(path, "ada"), seed=2)
+    game.read_save()
+    return game
+
+def test_failed_save_discards_its_rolls(tmp_path, monkeypatch):
+    path = tmp_path / "saves.db"
+    monkeypatch.setattr(game_module, "SQLITE_ROLL_CHUNK", 1_000)
+    database = game_module.SQLiteSaves(path, "ada")
+    game = new_game(database)
+    game.roll_batch(5_000)
+    game.write_save()
+    game.roll_batch(5_000)
+
+    def fail(*args):
+        raise sqlite3.OperationalError("disk I/O error")
+    monkeypatch.setattr(database, "write_state", fail)
+    with pytest.raises(sqlite3.OperationalError):
+        game.write_save()
+    # the chunks that did commit are gone again
+    assert stored_rolls(path) == (5_000, 5_000)
+    assert database.saved_roll_high == 5_000
+
+    monkeypatch.undo()
+    game.write_save()
+    assert stored_rolls(path) == (10_000, 10_000)
+    loaded = reload(path)
+    assert list(loaded.roll_log) == list(game.roll_log)
+    database.close()
+    loaded.database.close()
+
+def test_load_drops_rolls_past_roll_high(tmp_path):
+    path = tmp_path / "saves.db"
+    database = game_module.SQLiteSaves(path, "ada")
+    game = new_game(database)
+    game.roll_batch(5_000)
+    game.write_save()
+    expected = list(game.roll_log)
+    # a save that died between its roll chunks and its state
+    game.roll_batch(5_000)
+    database.insert_rolls(game.roll_log)
+    database.close()
+
+    loaded = reload(path)
+    assert stored_rolls(path) == (5_000, 5_000)
+    assert loaded.total_rolls == 5_000
+    assert list(loaded.roll_log) == expected
+    loaded.database.close()
+
+def test_saves_without_roll_high_use_the_stored_rolls(tmp_path):
+    path = tmp_path / "saves.db"
+    database = game_module.SQLiteSaves(path, "ada")
+    game = new_game(database)
+    game.roll_batch(5_000)
+    game.write_save()
+    database.close()
+    with sqlite3.connect(path) as db:
+        db.execute("UPDATE players SET roll_high = NULL")
+
+    loaded = reload(path)
+    assert loaded.database.saved_roll_high == 5_000
+    assert len(loaded.roll_log) == 5_000
+    loaded.database.close()